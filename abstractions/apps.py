@@ -1,13 +1,19 @@
 from abc import ABC, abstractmethod
 from typing import TYPE_CHECKING
 
-from pygame import Surface
+from pygame import Rect, Surface
 
 if TYPE_CHECKING:
     from settings import AppEvents
 
 
 class AppComponent(ABC):
+    # Screen areas changed by the last `draw`, None for the whole screen.
+    dirty_rects: list[Rect] | None = None
+    is_invalidated: bool = True
+    # Fraction of a simulation tick elapsed since the last `update`.
+    interpolation: float = 1.0
+
     @abstractmethod
     def __init__(self, screen: Surface) -> None:
         self.screen = screen
@@ -15,6 +21,9 @@ class AppComponent(ABC):
         self.event: AppEvents
         self.time_now: float
 
+    def invalidate(self) -> None:
+        self.is_invalidated = True
+
     @abstractmethod
     def handle_input(self, inputs: set[int]) -> None:
         pass
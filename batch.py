@@ -0,0 +1,250 @@
+import os
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from itertools import product
+from pathlib import Path
+from time import perf_counter
+
+import numpy as np
+import pygame as pg
+from pygame import Surface
+
+from components.menu import ShopMenu
+from headless import HeadlessRunner
+from settings import DefaultStats, Prices, Settings
+
+COLUMNS: tuple[str, ...] = (
+    'seed',
+    'asteroids_per_level',
+    'start_lives',
+    'start_max_bullets',
+    'price_bullets',
+    'price_lives',
+    'level',
+    'cleared',
+    'credits_earned',
+    'lives_lost',
+    'time_to_clear',
+)
+
+
+@dataclass
+class RunParameters:
+    seed: int
+    asteroids_per_level: int = Settings.asteroids_per_level
+    defaults: DefaultStats = field(default_factory=DefaultStats)
+    prices: Prices = field(default_factory=Prices)
+    max_levels: int = 10
+    max_frames: int = 60 * 60 * 10
+
+
+class BatchRunner(HeadlessRunner):
+    """Plays one run of the game with the autopilot and one parameter set.
+
+    The shop buys lives first and gun upgrades with what is left, then
+    starts the next level. One row per level is kept in `rows`, the run
+    ends on game over, after `max_levels` levels or `max_frames` frames.
+    A level lost or cut short by `max_frames` is kept as not cleared.
+    """
+
+    def __init__(self, parameters: RunParameters, dt: float) -> None:
+        super().__init__(parameters.seed, dt, is_drawing=False)
+        self.parameters: RunParameters = parameters
+        self.game.defaults = parameters.defaults
+        self.game.asteroids_per_level = parameters.asteroids_per_level
+        self.game.restart()
+        self.shop: ShopMenu = ShopMenu(
+            Surface((1, 1)),
+            self.game.stats,
+            parameters.prices,
+        )
+
+        self.rows: list[tuple[int | float, ...]] = []
+        self.is_finished: bool = False
+        self.start_level()
+
+    def start_level(self) -> None:
+        self.level_started_at: int = self.frame
+        self.level_credits: int = self.game.stats.credits
+        self.level_lives: int = self.game.stats.lives
+
+    def end_level(self, is_cleared: bool) -> None:
+        parameters = self.parameters
+        stats = self.game.stats
+        self.rows.append(
+            (
+                parameters.seed,
+                parameters.asteroids_per_level,
+                parameters.defaults.lives,
+                parameters.defaults.max_bullets,
+                parameters.prices.bullets,
+                parameters.prices.lives,
+                stats.level,
+                is_cleared,
+                stats.credits - self.level_credits,
+                self.level_lives - stats.lives,
+                (self.frame - self.level_started_at) * self.dt,
+            ),
+        )
+
+    def visit_shop(self) -> None:
+        self.end_level(is_cleared=True)
+        if self.game.stats.level >= self.parameters.max_levels:
+            self.is_finished = True
+            return
+
+        while self.shop.is_enough_credits(self.parameters.prices.lives):
+            self.shop.increase_lives()
+        while self.shop.is_enough_credits(self.parameters.prices.bullets):
+            self.shop.increase_max_bullets()
+        self.shop.go_to_next_level()
+        self.start_level()
+
+    def run_to_end(self) -> list[tuple[int | float, ...]]:
+        while not self.is_finished:
+            self.step()
+            if self.game.game_over:
+                self.end_level(is_cleared=False)
+                self.is_finished = True
+            elif self.frame >= self.parameters.max_frames:
+                self.end_level(is_cleared=False)
+                self.is_finished = True
+        return self.rows
+
+
+def init_worker() -> None:
+    os.environ['SDL_VIDEODRIVER'] = 'dummy'
+    pg.init()
+
+
+def simulate(
+    parameters: RunParameters,
+    dt: float = 1 / 60,
+) -> list[tuple[int | float, ...]]:
+    return BatchRunner(parameters, dt).run_to_end()
+
+
+def parameter_grid(
+    seeds: int,
+    asteroids_per_level: list[int],
+    lives: list[int],
+    max_bullets: list[int],
+    price_bullets: list[int],
+    price_lives: list[int],
+    max_levels: int,
+    max_frames: int,
+) -> list[RunParameters]:
+    return [
+        RunParameters(
+            seed=seed,
+            asteroids_per_level=per_level,
+            defaults=DefaultStats(lives=start_lives, max_bullets=bullets),
+            prices=Prices(bullets=bullets_price, lives=lives_price),
+            max_levels=max_levels,
+            max_frames=max_frames,
+        )
+        for (
+            per_level,
+            start_lives,
+            bullets,
+            bullets_price,
+            lives_price,
+            seed,
+        ) in product(
+            asteroids_per_level,
+            lives,
+            max_bullets,
+            price_bullets,
+            price_lives,
+            range(seeds),
+        )
+    ]
+
+
+def run_batch(
+    runs: list[RunParameters],
+    workers: int,
+) -> dict[str, np.ndarray]:
+    """Simulate all runs across a process pool into per-column arrays."""
+    chunksize = max(1, len(runs) // (workers * 4))
+    with ProcessPoolExecutor(workers, initializer=init_worker) as executor:
+        rows = [
+            row
+            for run_rows in executor.map(simulate, runs, chunksize=chunksize)
+            for row in run_rows
+        ]
+
+    columns = list(zip(*rows)) if rows else [()] * len(COLUMNS)
+    results = {
+        name: np.array(values) for name, values in zip(COLUMNS, columns)
+    }
+    results['cleared'] = results['cleared'].astype(bool)
+    return results
+
+
+def main() -> None:
+    parser = ArgumentParser(
+        description='Run many headless games across processes and collect '
+        'per-level outcomes. Every list option is swept, each combination '
+        'is played with --seeds different seeds.',
+    )
+    parser.add_argument('--seeds', type=int, default=8)
+    parser.add_argument(
+        '--asteroids-per-level',
+        type=int,
+        nargs='+',
+        default=[Settings.asteroids_per_level],
+    )
+    parser.add_argument(
+        '--lives',
+        type=int,
+        nargs='+',
+        default=[DefaultStats.lives],
+    )
+    parser.add_argument(
+        '--max-bullets',
+        type=int,
+        nargs='+',
+        default=[DefaultStats.max_bullets],
+    )
+    parser.add_argument(
+        '--price-bullets',
+        type=int,
+        nargs='+',
+        default=[Prices.bullets],
+    )
+    parser.add_argument(
+        '--price-lives',
+        type=int,
+        nargs='+',
+        default=[Prices.lives],
+    )
+    parser.add_argument('--max-levels', type=int, default=10)
+    parser.add_argument('--max-frames', type=int, default=60 * 60 * 10)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--output', type=Path, default=Path('batch.npz'))
+    args = parser.parse_args()
+
+    runs = parameter_grid(
+        args.seeds,
+        args.asteroids_per_level,
+        args.lives,
+        args.max_bullets,
+        args.price_bullets,
+        args.price_lives,
+        args.max_levels,
+        args.max_frames,
+    )
+    started_at = perf_counter()
+    results = run_batch(runs, args.workers)
+    elapsed = perf_counter() - started_at
+    np.savez(args.output, **results)
+
+    print(f'runs: {len(runs)}, levels: {len(results["level"])}')
+    print(f'workers: {args.workers}, elapsed: {elapsed:.1f} s')
+    print(f'results: {args.output}')
+
+
+if __name__ == '__main__':
+    main()
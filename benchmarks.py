@@ -0,0 +1,464 @@
+import gc
+import json
+import os
+import platform
+from argparse import ArgumentParser
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from functools import partial
+from pathlib import Path
+from random import Random
+from time import perf_counter
+from typing import Callable
+
+import numpy as np
+import pygame as pg
+from pygame import Surface
+from pygame.math import Vector2
+
+from components.game import Game
+from components.game_objects.asteroid import Asteroid
+from components.game_objects.game_object import GameObject
+from components.game_objects.ship import Ship
+from components.menu import PauseMenu
+from settings import Settings, UserStats
+
+RESULTS_VERSION: int = 1
+
+# A setup builds its scene untimed and returns the call to be timed.
+Setup = Callable[[], Callable[[], object]]
+
+
+@dataclass
+class Benchmark:
+    name: str
+    setup: Setup
+
+
+def new_game(seed: int = 0) -> Game:
+    return Game(Surface(Settings.screen_size), Random(seed))
+
+
+def game_object_update(count: int) -> Callable[[], object]:
+    rng = Random(0)
+    objects = []
+    for _ in range(count):
+        obj = GameObject(
+            rng.uniform(0, Settings.screen_size_x),
+            rng.uniform(0, Settings.screen_size_y),
+        )
+        obj.velocity = Vector2(rng.uniform(-100, 100), rng.uniform(-100, 100))
+        objects.append(obj)
+
+    def run() -> None:
+        for obj in objects:
+            obj.update(1 / 60, 0.0)
+
+    return run
+
+
+def ship_update(bullets: int) -> Callable[[], object]:
+    """Bullets stand still, so they stay alive however often it runs."""
+    game = new_game()
+    ship = game.ship
+    rng = Random(0)
+    for _ in range(bullets):
+        ship.bullets.spawn(
+            game.bullet_pool.acquire(
+                rng.uniform(0, Settings.screen_size_x),
+                rng.uniform(0, Settings.screen_size_y),
+                Vector2(),
+            ),
+        )
+    ship.bullets.apply()
+    ship.rotation_speed = 180
+    return partial(ship.update, 1 / 60, 0.0)
+
+
+def collision_scene(asteroids: int, bullets: int) -> Game:
+    """Game with only misses, so the collision passes change nothing.
+
+    Asteroids keep clear of the ship, and bullets flying into an
+    asteroid during their last tick are left out.
+    """
+    game = new_game()
+    game.enable_stress_mode(asteroids)
+    while len(game.asteroids) < asteroids:
+        game.refill_asteroids()
+        game.asteroids.apply()
+
+    rng = Random(1)
+    while len(game.ship.bullets) < bullets:
+        velocity = Vector2(300, 0)
+        velocity.rotate_ip(rng.uniform(0, 360))
+        bullet = game.bullet_pool.acquire(
+            rng.uniform(0, Settings.screen_size_x),
+            rng.uniform(0, Settings.screen_size_y),
+            velocity,
+        )
+        bullet.update(1 / 60, 0.0)
+        if (
+            bullet.alive
+            and game.find_swept_collision(bullet, game.asteroids) is None
+        ):
+            game.ship.bullets.spawn(bullet)
+            game.ship.bullets.apply()
+        else:
+            bullet.release()
+
+    if Settings.use_spatial_hash:
+        game.asteroids_grid.rebuild(game.asteroids)
+    game.time_now = game.ship_spawned_at + 10.0
+    return game
+
+
+def bullet_collisions(asteroids: int, bullets: int) -> Callable[[], object]:
+    game = collision_scene(asteroids, bullets)
+    return game.check_collisions_bullets_and_asteroids
+
+
+def ship_collisions(asteroids: int) -> Callable[[], object]:
+    game = collision_scene(asteroids, 0)
+    return game.check_collisions_ship_and_asteroids
+
+
+def grid_rebuild(asteroids: int) -> Callable[[], object]:
+    """Spatial hash rebuild run every tick before the collision passes."""
+    game = collision_scene(asteroids, 0)
+    return partial(game.asteroids_grid.rebuild, game.asteroids)
+
+
+def asteroid_split() -> Callable[[], object]:
+    game = new_game()
+    asteroid = game.asteroid_pool.acquire(700, 450, 3)
+
+    def run() -> None:
+        for fragment in asteroid.split():
+            fragment.release()
+
+    return run
+
+
+def asteroid_draw(count: int, is_atlas: bool) -> Callable[[], object]:
+    screen = Surface(Settings.screen_size)
+    rng = Random(0)
+    use_sprite_atlas = Settings.use_sprite_atlas
+    Settings.use_sprite_atlas = is_atlas
+    try:
+        asteroids = [
+            Asteroid(
+                rng.uniform(0, Settings.screen_size_x),
+                rng.uniform(0, Settings.screen_size_y),
+                rng.randint(1, 3),
+                rng,
+            )
+            for _ in range(count)
+        ]
+    finally:
+        Settings.use_sprite_atlas = use_sprite_atlas
+
+    def run() -> None:
+        for asteroid in asteroids:
+            asteroid.draw(screen, 0.5)
+
+    return run
+
+
+def ship_draw(is_atlas: bool) -> Callable[[], object]:
+    screen = Surface(Settings.screen_size)
+    use_sprite_atlas = Settings.use_sprite_atlas
+    Settings.use_sprite_atlas = is_atlas
+    try:
+        ship = Ship(*Settings.screen_center, UserStats())
+    finally:
+        Settings.use_sprite_atlas = use_sprite_atlas
+    ship.angle = 30
+    return partial(ship.draw, screen, 0.5)
+
+
+def hud_draw(is_changing: bool) -> Callable[[], object]:
+    """HUD blits of `Game.draw`, with new text every call if changing."""
+    game = new_game()
+
+    def run() -> None:
+        if is_changing:
+            game.stats.credits += 100
+        game.screen.blits(game.hud_blits(), doreturn=False)
+
+    return run
+
+
+def menu_draw(is_rebuilding: bool) -> Callable[[], object]:
+    """Pause menu with stats, moving the selection every call if rebuilding."""
+    menu = PauseMenu(Surface(Settings.screen_size), UserStats())
+    menu.draw()
+
+    def run() -> None:
+        if is_rebuilding:
+            menu.select_prev_menu_item()
+        menu.draw()
+
+    return run
+
+
+BENCHMARKS: tuple[Benchmark, ...] = (
+    Benchmark('game_object_update_1000', partial(game_object_update, 1000)),
+    *(
+        Benchmark(
+            f'ship_update_bullets_{bullets}',
+            partial(ship_update, bullets),
+        )
+        for bullets in (0, 20, 100)
+    ),
+    *(
+        Benchmark(
+            f'bullet_collisions_a{asteroids}_b{bullets}',
+            partial(bullet_collisions, asteroids, bullets),
+        )
+        for asteroids in (10, 100, 1000)
+        for bullets in (10, 100)
+    ),
+    *(
+        Benchmark(
+            f'ship_collisions_a{asteroids}',
+            partial(ship_collisions, asteroids),
+        )
+        for asteroids in (10, 100, 1000)
+    ),
+    *(
+        Benchmark(
+            f'grid_rebuild_a{asteroids}',
+            partial(grid_rebuild, asteroids),
+        )
+        for asteroids in (100, 1000, 2000)
+    ),
+    Benchmark('asteroid_split', asteroid_split),
+    Benchmark('asteroid_draw_100', partial(asteroid_draw, 100, False)),
+    Benchmark('asteroid_draw_100_atlas', partial(asteroid_draw, 100, True)),
+    Benchmark('ship_draw', partial(ship_draw, False)),
+    Benchmark('ship_draw_atlas', partial(ship_draw, True)),
+    Benchmark('hud_draw', partial(hud_draw, False)),
+    Benchmark('hud_draw_changing', partial(hud_draw, True)),
+    Benchmark('menu_draw', partial(menu_draw, False)),
+    Benchmark('menu_draw_rebuild', partial(menu_draw, True)),
+)
+
+
+def time_calls(run: Callable[[], object], number: int) -> float:
+    started_at = perf_counter()
+    for _ in range(number):
+        run()
+    return perf_counter() - started_at
+
+
+def calibrate(run: Callable[[], object], min_time: float) -> int:
+    """Smallest of 1, 2, 5, 10, 20, ... calls lasting `min_time`."""
+    base = 1
+    while True:
+        for factor in (1, 2, 5):
+            number = base * factor
+            if time_calls(run, number) >= min_time:
+                return number
+        base *= 10
+
+
+def summarize(samples: list[float]) -> dict[str, float]:
+    values = np.array(samples)
+    q1, median, q3 = np.percentile(values, (25, 50, 75))
+    return {
+        'min': float(values.min()),
+        'q1': float(q1),
+        'median': float(median),
+        'q3': float(q3),
+        'max': float(values.max()),
+        'mean': float(values.mean()),
+        'stdev': float(values.std(ddof=1)) if len(values) > 1 else 0.0,
+    }
+
+
+def measure(
+    benchmark: Benchmark,
+    warmup: int,
+    repeat: int,
+    min_time: float,
+) -> dict[str, object]:
+    """Seconds per call of `benchmark`, `repeat` samples of `number` calls.
+
+    The number of calls per sample is calibrated first, then `warmup`
+    samples are thrown away. Garbage collection is off while timing, as
+    with `timeit`.
+    """
+    run = benchmark.setup()
+    number = calibrate(run, min_time)
+    is_gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(warmup):
+            time_calls(run, number)
+        samples = [time_calls(run, number) / number for _ in range(repeat)]
+    finally:
+        if is_gc_enabled:
+            gc.enable()
+    return {'number': number, 'samples': samples, **summarize(samples)}
+
+
+def environment() -> dict[str, str]:
+    return {
+        'python': platform.python_version(),
+        'pygame': pg.version.ver,
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+    }
+
+
+def run_benchmarks(
+    benchmarks: list[Benchmark],
+    warmup: int,
+    repeat: int,
+    min_time: float,
+) -> dict[str, object]:
+    results = {}
+    for benchmark in benchmarks:
+        result = measure(benchmark, warmup, repeat, min_time)
+        results[benchmark.name] = result
+        print(
+            f'{benchmark.name:<32} {result["number"]:>7} calls  '
+            f'median {result["median"] * 1e6:10.2f} us  '
+            f'iqr {(result["q3"] - result["q1"]) * 1e6:8.2f} us',
+        )
+    return {
+        'version': RESULTS_VERSION,
+        'environment': environment(),
+        'warmup': warmup,
+        'repeat': repeat,
+        'min_time': min_time,
+        'benchmarks': results,
+    }
+
+
+def compare(
+    baseline: dict,
+    current: dict,
+    threshold: float,
+) -> list[str]:
+    """Print the change of every benchmark, return the regressed ones.
+
+    A benchmark regresses when its median is more than `threshold`
+    slower than the baseline median and the interquartile ranges of the
+    two runs do not overlap, so a noisy sample alone does not fail it.
+    """
+    regressions = []
+    old_results = baseline['benchmarks']
+    new_results = current['benchmarks']
+    for name, new in new_results.items():
+        old = old_results.get(name)
+        if old is None:
+            print(f'{name:<32} new')
+            continue
+
+        change = new['median'] / old['median'] - 1
+        if change > threshold and new['q1'] > old['q3']:
+            verdict = 'REGRESSION'
+            regressions.append(name)
+        elif change < -threshold and new['q3'] < old['q1']:
+            verdict = 'faster'
+        else:
+            verdict = ''
+        print(
+            f'{name:<32} {old["median"] * 1e6:10.2f} us '
+            f'-> {new["median"] * 1e6:10.2f} us  {change:+7.1%}  {verdict}',
+        )
+
+    for name in old_results.keys() - new_results.keys():
+        print(f'{name:<32} missing')
+    return regressions
+
+
+def load_results(path: Path) -> dict:
+    results = json.loads(path.read_text(encoding='utf-8'))
+    if results.get('version') != RESULTS_VERSION:
+        raise SystemExit(f'{path} is not a version {RESULTS_VERSION} result')
+    return results
+
+
+def main() -> None:
+    parser = ArgumentParser(
+        description='Time the engine hot paths offscreen and compare runs.',
+    )
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='run the benchmarks')
+    run_parser.add_argument(
+        '-k',
+        '--filter',
+        default='',
+        help='only run benchmarks whose name contains this',
+    )
+    run_parser.add_argument('--warmup', type=int, default=2)
+    run_parser.add_argument('--repeat', type=int, default=7)
+    run_parser.add_argument(
+        '--min-time',
+        type=float,
+        default=0.05,
+        help='seconds each sample should last at least',
+    )
+    run_parser.add_argument('--output', type=Path, help='results JSON')
+    run_parser.add_argument(
+        '--baseline',
+        type=Path,
+        help='results JSON to compare against after the run',
+    )
+    run_parser.add_argument('--threshold', type=float, default=0.1)
+
+    compare_parser = commands.add_parser(
+        'compare',
+        help='compare two results files, exit 1 on a regression',
+    )
+    compare_parser.add_argument('baseline', type=Path)
+    compare_parser.add_argument('current', type=Path)
+    compare_parser.add_argument('--threshold', type=float, default=0.1)
+    args = parser.parse_args()
+
+    if args.command == 'compare':
+        baseline = load_results(args.baseline)
+        current = load_results(args.current)
+    else:
+        os.environ['SDL_VIDEODRIVER'] = 'dummy'
+        pg.init()
+        baseline = (
+            load_results(args.baseline) if args.baseline is not None else None
+        )
+        current = run_benchmarks(
+            [
+                benchmark
+                for benchmark in BENCHMARKS
+                if args.filter in benchmark.name
+            ],
+            args.warmup,
+            args.repeat,
+            args.min_time,
+        )
+        pg.quit()
+        if args.output is not None:
+            args.output.write_text(
+                json.dumps(current, indent=2),
+                encoding='utf-8',
+            )
+        if baseline is None:
+            return
+        baseline['benchmarks'] = {
+            name: result
+            for name, result in baseline['benchmarks'].items()
+            if args.filter in name
+        }
+
+    regressions = compare(baseline, current, args.threshold)
+    if regressions:
+        print(f'{len(regressions)} regressions over {args.threshold:.0%}')
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+import json
+import os
+from pathlib import Path
+
+from pygame.font import Font, SysFont
+
+from settings import Settings
+
+ResolvedFont = tuple[str | None, bool, bool]
+
+
+class FontRegistry:
+    """Shared fonts, each system font looked up once per process.
+
+    The first system font lookup makes pygame scan every installed font,
+    which takes seconds on slow machines. The resolved file and faked
+    styles are kept in `cache_path`, so later launches skip the scan
+    entirely as long as the files still exist.
+    """
+
+    def __init__(self, cache_path: Path | None) -> None:
+        self.cache_path: Path | None = cache_path
+        self.resolved: dict[str, ResolvedFont] | None = None
+        self.fonts: dict[tuple[str, int, bool, bool], Font] = {}
+
+    @staticmethod
+    def style_key(name: str, bold: bool, italic: bool) -> str:
+        return f'{name}:{int(bold)}{int(italic)}'
+
+    def load(self) -> dict[str, ResolvedFont]:
+        resolved: dict[str, ResolvedFont] = {}
+        if self.cache_path is None:
+            return resolved
+
+        try:
+            with open(self.cache_path, encoding='utf-8') as file:
+                cached = json.load(file)
+        except (OSError, ValueError):
+            return resolved
+
+        for key, (path, fake_bold, fake_italic) in cached.items():
+            if path is None or os.path.exists(path):
+                resolved[key] = path, fake_bold, fake_italic
+        return resolved
+
+    def save(self) -> None:
+        if self.cache_path is None or self.resolved is None:
+            return
+
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.cache_path, 'w', encoding='utf-8') as file:
+                json.dump(self.resolved, file, indent=2)
+        except OSError:
+            pass
+
+    def resolve(self, name: str, bold: bool, italic: bool) -> ResolvedFont:
+        """Return the font file and the styles pygame has to fake."""
+        if self.resolved is None:
+            self.resolved = self.load()
+
+        key = self.style_key(name, bold, italic)
+        if key not in self.resolved:
+            # Same lookup as `SysFont`, minus loading the font itself.
+            self.resolved[key] = SysFont(
+                name,
+                0,
+                bold,
+                italic,
+                lambda path, size, fake_bold, fake_italic: (
+                    path,
+                    fake_bold,
+                    fake_italic,
+                ),
+            )
+            self.save()
+        return self.resolved[key]
+
+    def get(
+        self,
+        name: str,
+        size: int,
+        bold: bool = False,
+        italic: bool = False,
+    ) -> Font:
+        key = (name, size, bold, italic)
+        font = self.fonts.get(key)
+        if font is None:
+            path, fake_bold, fake_italic = self.resolve(name, bold, italic)
+            font = Font(path, size)
+            font.set_bold(fake_bold)
+            font.set_italic(fake_italic)
+            self.fonts[key] = font
+        return font
+
+
+fonts = FontRegistry(
+    Path(Settings.font_cache_path).expanduser()
+    if Settings.font_cache_path
+    else None,
+)
@@ -1,21 +1,42 @@
-from random import randint
+from functools import partial
+from random import Random
+from typing import Callable, Iterable, Sequence
 
 from pygame import (
+    K_BACKSPACE,
     K_ESCAPE,
     K_LEFT,
     K_RIGHT,
     K_SPACE,
     K_UP,
     K_r,
+    Rect,
     Surface,
 )
-from pygame.font import SysFont
+from pygame.draw import circle
 from pygame.key import get_pressed
 from pygame.math import Vector2
 
 from abstractions.apps import AppComponent
+from components.fonts import fonts
 from components.game_objects.asteroid import Asteroid
+from components.game_objects.bullet import Bullet
+from components.game_objects.entity_list import EntityList
+from components.game_objects.entity_store import (
+    EntityStore,
+    StoredAsteroid,
+    StoredBullet,
+)
+from components.game_objects.game_object import GameObject
+from components.game_objects.pool import ObjectPool
 from components.game_objects.ship import Ship
+from components.profiler import profiler
+from components.quality import QualityGovernor, QualityLevel
+from components.rendering import FrameSnapshot, Layer, SpriteBatch
+from components.rewind import RewindBuffer
+from components.spatial_hash import SpatialHash
+from components.spawning import StratifiedSampler
+from components.text_cache import HudLabel
 from settings import (
     AppEvents,
     Colors,
@@ -26,41 +47,150 @@ from settings import (
 
 
 class Game(AppComponent):
-    def __init__(self, screen: Surface) -> None:
+    def __init__(
+        self,
+        screen: Surface,
+        rng: Random | None = None,
+        stats: UserStats | None = None,
+        defaults: DefaultStats | None = None,
+    ) -> None:
         self.event: AppEvents = AppEvents.no_event
         self.time_now: float = 0.0
+        self.rng: Random = rng if rng is not None else Random()
+        self.stats: UserStats = stats if stats is not None else UserStats()
+        self.defaults: DefaultStats = (
+            defaults if defaults is not None else DefaultStats()
+        )
+        self.asteroids_per_level: int = Settings.asteroids_per_level
+        # Endless mode keeping this many asteroids alive, 0 when off.
+        self.stress_population: int = 0
+        self.spawn_sampler: StratifiedSampler | None = None
+        self.get_pressed: Callable[[], Sequence[bool]] = get_pressed
 
         self.screen = screen
         self.screen_center: tuple[int, int] = Settings.screen_center
-        self.font = SysFont('Arial', 24)
-        self.asteroids: list[Asteroid] = []
+        self.font = fonts.get('Arial', 24)
+        self.level_label = HudLabel(
+            self.font,
+            Colors.white,
+            lambda level: f'Level: {level}',
+        )
+        self.credits_label = HudLabel(
+            self.font,
+            Colors.white,
+            lambda credits: f'Credits: {credits}',
+        )
+        self.lives_label = HudLabel(
+            self.font,
+            Colors.white,
+            lambda lives: f'Lives: {lives}',
+        )
+        self.bullets_label = HudLabel(
+            self.font,
+            Colors.white,
+            lambda cur_bullets, max_bullets: (
+                f'Bullets: [{cur_bullets} / {max_bullets}] '
+                + ('|' * cur_bullets)
+            ),
+        )
+        self.bullets_reloading_label = HudLabel(
+            self.font,
+            Colors.red,
+            lambda: 'Bullets: RELOADING...',
+        )
+        self.entity_store: EntityStore | None = None
+        self.asteroid_pool: ObjectPool[Asteroid] = ObjectPool(
+            partial(Asteroid, rng=self.rng),
+            Settings.object_pool_size,
+        )
+        self.bullet_pool: ObjectPool[Bullet] = ObjectPool(
+            Bullet,
+            Settings.object_pool_size,
+        )
+        if Settings.use_entity_store:
+            self.entity_store = EntityStore()
+            self.asteroid_pool.factory = partial(
+                StoredAsteroid,
+                self.entity_store,
+                rng=self.rng,
+            )
+            self.bullet_pool.factory = partial(StoredBullet, self.entity_store)
+        self.asteroids: EntityList[Asteroid] = EntityList()
+        self.asteroids_grid: SpatialHash = SpatialHash(
+            Settings.spatial_hash_cell_size,
+        )
         self.asteroids_amount: int = Settings.asteroids_start_amount
 
-        self.current_level: int = UserStats.level
-        self.ship: Ship = Ship(*Settings.screen_center)
+        self.current_level: int = self.stats.level
+        self.ship: Ship = Ship(
+            *Settings.screen_center,
+            self.stats,
+            self.bullet_pool,
+        )
         self.ship_spawned_at: float = self.time_now
         self.game_over: bool = False
+        self.rewind: RewindBuffer | None = (
+            RewindBuffer(
+                Settings.rewind_seconds,
+                Settings.tick_rate,
+                Settings.rewind_keyframe_interval,
+            )
+            if Settings.use_rewind
+            else None
+        )
+        self.is_rewinding: bool = False
+        # Set by the app to draw and collide cheaper under load.
+        self.quality: QualityGovernor | None = None
+        self.hud: list[tuple[Surface, Rect]] = []
+        self.hud_frames_left: int = 0
+        self.sprite_batch: SpriteBatch = SpriteBatch()
+        self.drawn_rects: list[Rect] = []
+        self.drawn_hud: list[tuple[Surface, Rect]] = []
 
         self.restart()
-        self.generate_ship()
-        self.generate_asteroids()
 
     def generate_ship(self) -> None:
-        self.ship = Ship(*Settings.screen_center)
+        self.ship.release()
+        self.ship = Ship(*Settings.screen_center, self.stats, self.bullet_pool)
+        self.ship.cur_bullets = self.defaults.max_bullets
         self.ship.velocity = Vector2(0, 0)
         self.ship_spawned_at = self.time_now
 
     def is_place_far_for_ship(self, x: int, y: int) -> bool:
-        place: Vector2 = Vector2(x, y)
-        return place.distance_to(self.ship.position) > Settings.safe_distance
+        dx = x - self.ship.position.x
+        dy = y - self.ship.position.y
+        return dx * dx + dy * dy > Settings.safe_distance**2
 
     def generate_asteroids(self) -> None:
-        while len(self.asteroids) < self.asteroids_amount:
-            x = randint(0, Settings.screen_size_x)
-            y = randint(0, Settings.screen_size_y)
+        missing = self.asteroids_amount - len(self.asteroids)
+        while missing > 0:
+            x = self.rng.randint(0, Settings.screen_size_x)
+            y = self.rng.randint(0, Settings.screen_size_y)
 
             if self.is_place_far_for_ship(x, y):
-                self.asteroids.append(Asteroid(x, y))
+                self.asteroids.spawn(self.asteroid_pool.acquire(x, y))
+                missing -= 1
+        self.asteroids.apply()
+
+    def enable_stress_mode(self, population: int) -> None:
+        self.stress_population = population
+        self.spawn_sampler = StratifiedSampler(self.rng, population)
+
+    def refill_asteroids(self) -> None:
+        """Top the stress population up by at most one batch per tick."""
+        missing = self.stress_population - len(self.asteroids)
+        if missing <= 0 or self.spawn_sampler is None:
+            return
+
+        for x, y in self.spawn_sampler.sample(
+            min(missing, Settings.stress_spawn_per_tick),
+            self.ship.position,
+            Settings.safe_distance,
+        ):
+            self.asteroids.spawn(self.asteroid_pool.acquire(x, y))
+
+    def is_reduced(self, level: QualityLevel) -> bool:
+        return self.quality is not None and self.quality.is_active(level)
 
     def go_to_main_menu(self) -> None:
         self.event = AppEvents.go_to_main_menu
@@ -72,7 +202,14 @@ class Game(AppComponent):
         self.event = AppEvents.go_to_shop_menu
 
     def handle_input(self, inputs: set[int]) -> None:
-        keys = get_pressed()
+        keys = self.get_pressed()
+
+        if K_ESCAPE in inputs:
+            self.go_to_pause_menu()
+
+        self.is_rewinding = self.rewind is not None and keys[K_BACKSPACE]
+        if self.is_rewinding:
+            return
 
         if keys[K_LEFT]:
             self.ship.rotation_speed = -180
@@ -92,45 +229,113 @@ class Game(AppComponent):
         if K_r in inputs:
             self.ship.start_reloading()
 
-        if K_ESCAPE in inputs:
-            self.go_to_pause_menu()
+    def find_collision(
+        self,
+        obj: GameObject,
+        candidates: Iterable[GameObject],
+    ) -> GameObject | None:
+        for candidate in candidates:
+            if candidate.alive and obj.check_collision(candidate):
+                return candidate
+        return None
+
+    def find_swept_collision(
+        self,
+        obj: GameObject,
+        candidates: Iterable[GameObject],
+    ) -> GameObject | None:
+        hit = None
+        hit_time = 2.0
+        for candidate in candidates:
+            if not candidate.alive:
+                continue
+            time = obj.swept_collision_time(candidate)
+            if time is not None and time < hit_time:
+                hit = candidate
+                hit_time = time
+        return hit
+
+    def find_asteroid_collision(
+        self,
+        obj: GameObject,
+        is_swept: bool = False,
+    ) -> Asteroid | None:
+        find = self.find_swept_collision if is_swept else self.find_collision
+        if not Settings.use_spatial_hash:
+            return find(obj, self.asteroids)
+
+        if is_swept:
+            start = obj.previous_position
+            end = obj.position
+            center = (start + end) / 2
+            radius = start.distance_to(end) / 2 + obj.radius
+        else:
+            center = obj.position
+            radius = obj.radius
+
+        hit = find(obj, self.asteroids_grid.query(center, radius))
+        if Settings.compare_collision_broad_phase:
+            expected = find(obj, self.asteroids)
+            if hit is not expected:
+                raise RuntimeError(
+                    f'Broad phase mismatch at {obj.position}: '
+                    f'spatial hash found {hit}, brute force found {expected}',
+                )
+        return hit
+
+    def destroy_asteroid(self, asteroid: Asteroid) -> None:
+        self.asteroids.despawn(asteroid)
+        self.stats.credits += (4 - asteroid.size) * 100
+
+        for fragment in asteroid.split():
+            self.asteroids.spawn(fragment)
 
     def check_collisions_bullets_and_asteroids(self) -> None:
-        for bullet in self.ship.bullets[:]:
-            for asteroid in self.asteroids[:]:
-                if bullet.check_collision(asteroid):
-                    self.ship.bullets.remove(bullet)
-                    self.asteroids.remove(asteroid)
+        is_coarse = self.is_reduced(QualityLevel.coarse_collisions)
+        far_squared = Settings.quality_far_distance**2
+        ship_position = self.ship.position
+        for bullet in self.ship.bullets:
+            # Far from the ship a hit only needs to be seen, not timed.
+            is_swept = Settings.use_swept_bullet_collisions and not (
+                is_coarse
+                and bullet.position.distance_squared_to(ship_position)
+                > far_squared
+            )
+            asteroid = self.find_asteroid_collision(bullet, is_swept)
+            if asteroid is not None:
+                self.ship.bullets.despawn(bullet)
+                self.destroy_asteroid(asteroid)
 
-                    UserStats.credits += (4 - asteroid.size) * 100
+    def apply_spawns_and_despawns(self) -> None:
+        self.ship.bullets.apply()
+        self.asteroids.apply()
 
-                    fragments = asteroid.split()
-                    self.asteroids.extend(fragments)
-                    break
+    def is_ship_vulnerable(self) -> bool:
+        return self.time_now > self.ship_spawned_at + 2.0
 
     def check_collisions_ship_and_asteroids(self) -> None:
-        for asteroid in self.asteroids[:]:
-            if (
-                self.ship.check_collision(asteroid)
-                and self.time_now > self.ship_spawned_at + 2.0
-            ):
-                self.generate_ship()
-                UserStats.lives -= 1
+        if (
+            self.is_ship_vulnerable()
+            and self.find_asteroid_collision(self.ship) is not None
+        ):
+            self.generate_ship()
+            if not self.stress_population:
+                self.stats.lives -= 1
 
-            if UserStats.lives < 1:
-                self.game_over = True
+        if self.stats.lives < 1:
+            self.game_over = True
 
     def check_for_win(self) -> None:
-        if not self.asteroids:
+        if not self.asteroids and not self.stress_population:
             self.go_to_shop_menu()
 
     def start_new_level(self) -> None:
-        self.current_level = UserStats.level
+        self.current_level = self.stats.level
 
         self.generate_ship()
-        self.ship.cur_bullets = UserStats.max_bullets
+        self.ship.cur_bullets = self.stats.max_bullets
 
-        self.asteroids_amount = 2 * UserStats.level
+        self.asteroids_amount = self.asteroids_per_level * self.stats.level
         self.generate_asteroids()
 
     def update(self, dt: float, time_now: float) -> None:
@@ -141,77 +346,205 @@ class Game(AppComponent):
             self.go_to_main_menu()
             return
 
-        if self.current_level != UserStats.level:
+        if self.is_rewinding and self.rewind is not None:
+            self.rewind.step_back(self)
+            return
+
+        if self.current_level != self.stats.level:
             self.start_new_level()
 
+        profiler.mark()
+        if self.stress_population:
+            self.refill_asteroids()
+        # Shots fired while handling input join before anything moves.
+        self.apply_spawns_and_despawns()
+        profiler.lap('spawn')
+
+        if self.entity_store is not None:
+            self.entity_store.update(dt)
+            profiler.lap('asteroids')
+
         self.ship.update(dt, time_now)
+        profiler.lap('ship')
 
-        for asteroid in self.asteroids:
-            asteroid.update(dt, time_now)
+        if self.entity_store is None:
+            for asteroid in self.asteroids:
+                asteroid.update(dt, time_now)
+            profiler.lap('asteroids')
+
+        # Only the collision passes query the grid.
+        if Settings.use_spatial_hash and (
+            self.ship.bullets or self.is_ship_vulnerable()
+        ):
+            self.asteroids_grid.rebuild(self.asteroids)
+            profiler.lap('grid')
 
         self.check_collisions_bullets_and_asteroids()
+        profiler.lap('bullet_collisions')
         self.check_collisions_ship_and_asteroids()
+        profiler.lap('ship_collisions')
+        self.apply_spawns_and_despawns()
         self.check_for_win()
+        profiler.lap('cleanup')
+
+        if self.rewind is not None:
+            self.rewind.record(self)
+            profiler.lap('rewind')
+
+    def hud_blits(self) -> list[tuple[Surface, Rect]]:
+        if (
+            self.hud
+            and self.hud_frames_left > 0
+            and self.is_reduced(QualityLevel.slow_hud)
+        ):
+            self.hud_frames_left -= 1
+            return self.hud
+
+        self.hud = self.render_hud()
+        self.hud_frames_left = Settings.quality_hud_interval - 1
+        return self.hud
+
+    def render_hud(self) -> list[tuple[Surface, Rect]]:
+        level_text = self.level_label.render(self.stats.level)
+        score_text = self.credits_label.render(self.stats.credits)
+        lives_text = self.lives_label.render(self.stats.lives)
 
-    def draw(self) -> None:
-        self.screen.fill(Colors.blue_darker)
+        if not self.ship.is_reloading:
+            bullets_text = self.bullets_label.render(
+                self.ship.cur_bullets,
+                self.stats.max_bullets,
+            )
+        else:
+            bullets_text = self.bullets_reloading_label.render()
 
+        return [
+            (level_text, level_text.get_rect(topleft=(10, 10))),
+            (score_text, score_text.get_rect(topleft=(10, 40))),
+            (lives_text, lives_text.get_rect(topleft=(10, 70))),
+            (
+                bullets_text,
+                bullets_text.get_rect(
+                    topleft=(10, Settings.screen_size_y - 50),
+                ),
+            ),
+        ]
+
+    def draw_object(self, obj: GameObject) -> Rect | None:
+        if isinstance(obj, Asteroid) and self.is_reduced(
+            QualityLevel.circle_asteroids,
+        ):
+            return circle(self.screen, *obj.circle(self.interpolation))
+        return obj.draw(self.screen, self.interpolation)
+
+    def draw_objects(self) -> list[tuple[GameObject, Rect]]:
+        if self.game_over:
+            return []
+
+        if Settings.use_sprite_batch:
+            alpha = self.interpolation
+            drawn: list[tuple[GameObject, Rect]] = []
+            if self.is_reduced(QualityLevel.circle_asteroids):
+                drawn = [
+                    (asteroid, self.draw_object(asteroid))
+                    for asteroid in self.asteroids
+                ]
+            else:
+                self.sprite_batch.add(Layer.asteroids, self.asteroids, alpha)
+            self.sprite_batch.add(Layer.ship, (self.ship,), alpha)
+            self.sprite_batch.add(Layer.bullets, self.ship.bullets, alpha)
+            drawn.extend(self.sprite_batch.submit(self.screen, alpha))
+            return drawn
+
+        objects: list[GameObject] = [self.ship]
+        objects.extend(self.ship.bullets)
+        objects.extend(self.asteroids)
+
+        # Rects come from the draw calls themselves: pygame's clipping of
+        # thick polygons can leave pixels outside the object's radius.
+        return [(obj, self.draw_object(obj)) for obj in objects]
+
+    def capture(self, snapshot: FrameSnapshot) -> None:
+        """Record the frame `draw` would produce, for the render thread."""
         if not self.game_over:
-            self.ship.draw(self.screen)
-
-            for asteroid in self.asteroids:
-                asteroid.draw(self.screen)
-
-        level_text = self.font.render(
-            f'Level: {UserStats.level}',
-            True,
-            Colors.white,
-        )
-        score_text = self.font.render(
-            f'Credits: {UserStats.credits}',
-            True,
-            Colors.white,
-        )
-        lives_text = self.font.render(
-            f'Lives: {UserStats.lives}',
-            True,
-            Colors.white,
-        )
-        bullets_text = self.font.render(
-            f'Bullets: [{self.ship.cur_bullets} / {UserStats.max_bullets}] '
-            + ('|' * self.ship.cur_bullets),
-            True,
-            Colors.white,
-        )
-        bullets_text_reloading = self.font.render(
-            'Bullets: RELOADING...',
-            True,
-            Colors.red,
+            alpha = self.interpolation
+            if self.is_reduced(QualityLevel.circle_asteroids):
+                snapshot.add_circles(Layer.asteroids, self.asteroids, alpha)
+            else:
+                snapshot.add(Layer.asteroids, self.asteroids, alpha)
+            snapshot.add(Layer.ship, (self.ship,), alpha)
+            snapshot.add(Layer.bullets, self.ship.bullets, alpha)
+        snapshot.hud.extend(self.hud_blits())
+
+    def is_dirty_area_too_large(self) -> bool:
+        """Whether redrawing rect by rect would cost more than a flip."""
+        width, height = self.screen.get_size()
+        drawn_area = sum(rect.width * rect.height for rect in self.drawn_rects)
+        # The new frame's objects cover about as much as the erased ones.
+        return (
+            2 * drawn_area
+            > width * height * Settings.dirty_rects_max_screen_share
         )
 
-        self.screen.blit(level_text, (10, 10))
-        self.screen.blit(score_text, (10, 40))
-        self.screen.blit(lives_text, (10, 70))
+    def draw(self) -> None:
+        hud = self.hud_blits()
+
+        if (
+            not Settings.use_dirty_rects
+            or self.is_invalidated
+            or self.is_dirty_area_too_large()
+        ):
+            self.screen.fill(Colors.blue_darker)
+            drawn = self.draw_objects()
+            self.screen.blits(hud, doreturn=False)
+
+            self.dirty_rects = None
+            self.is_invalidated = False
+            self.drawn_rects = [rect for _, rect in drawn]
+            self.drawn_hud = hud
+            return
 
-        if not self.ship.is_reloading:
-            self.screen.blit(
-                bullets_text,
-                (10, Settings.screen_size_y - 50),
-            )
-        else:
-            self.screen.blit(
-                bullets_text_reloading,
-                (10, Settings.screen_size_y - 50),
+        erased_rects = list(self.drawn_rects)
+        for (surface, _), (drawn_surface, drawn_rect) in zip(
+            hud,
+            self.drawn_hud,
+        ):
+            if surface is not drawn_surface:
+                erased_rects.append(drawn_rect)
+
+        for rect in erased_rects:
+            self.screen.fill(Colors.blue_darker, rect)
+        drawn = self.draw_objects()
+        object_rects = [rect for _, rect in drawn]
+
+        dirty_rects = erased_rects + object_rects
+        redrawn_hud = [
+            (surface, rect)
+            for (surface, rect), (drawn_surface, _) in zip(hud, self.drawn_hud)
+            if (
+                surface is not drawn_surface
+                or rect.collidelist(dirty_rects) != -1
             )
-
+        ]
+        if redrawn_hud:
+            hud_rects = [rect for _, rect in redrawn_hud]
+            for rect in hud_rects:
+                self.screen.fill(Colors.blue_darker, rect)
+            for obj, obj_rect in drawn:
+                if obj_rect.collidelist(hud_rects) != -1:
+                    self.draw_object(obj)
+            self.screen.blits(redrawn_hud, doreturn=False)
+            dirty_rects.extend(hud_rects)
+
+        self.dirty_rects = dirty_rects
+        self.drawn_rects = object_rects
+        self.drawn_hud = hud
 
     def restart(self) -> None:
-        UserStats.credits = DefaultStats.credits
-        UserStats.lives = DefaultStats.lives
-        UserStats.level = DefaultStats.level
-        UserStats.max_bullets = DefaultStats.max_bullets
+        self.stats.reset(self.defaults)
 
         self.asteroids.clear()
+        if self.rewind is not None:
+            self.rewind.clear()
         self.asteroids_amount = Settings.asteroids_start_amount
         self.game_over = False
 
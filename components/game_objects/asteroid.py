@@ -1,63 +1,132 @@
-import random
+from itertools import count
+from random import Random
+from typing import Iterator
 
-from pygame import Surface
+from pygame import Rect, Surface
 from pygame.draw import polygon
-from pygame.math import Vector2
 
-from components.game_objects.game_object import GameObject
+from components.game_objects.asteroid_shapes import (
+    AsteroidShape,
+    shape_library,
+)
+from components.game_objects.game_object import (
+    Circle,
+    GameObject,
+    Shape,
+)
+from components.game_objects.sprite_atlas import RotationAtlas
+from settings import Settings
+
+default_rng: Random = Random()
+# Every reset takes the next serial, so serials grow in spawn order.
+serials: Iterator[int] = count()
 
 
 class Asteroid(GameObject):
-    def __init__(self, x: float, y: float, size: int =3) -> None:
+    color: tuple[int, int, int] = (100, 100, 100)
+    max_rotation_speed: float = 180
+
+    __slots__ = (
+        'rng',
+        'atlas',
+        'serial',
+        'size',
+        'rotation_speed',
+        'shape_id',
+        'outline',
+    )
+
+    def __init__(
+        self,
+        x: float,
+        y: float,
+        size: int =3,
+        rng: Random = default_rng,
+    ) -> None:
         super().__init__(x, y)
-        self.time_now: float = 0.0
+        self.rng: Random = rng
+        self.atlas: RotationAtlas | None = None
+        self.reset(x, y, size)
+
+    def reset(self, x: float, y: float, size: int =3) -> None:
+        super().reset(x, y)
+        self.serial: int = next(serials)
         self.size = size
-        self.radius = size * 10
-        self.rotation_speed = random.uniform(-180, 180)
-
-        speed = random.uniform(50, 150)
-        angle = random.uniform(0, 360)
-        self.velocity = Vector2(speed, 0)
-        self.velocity.rotate_ip(angle)
-
-        self.vertices = []
-        num_vertices = 8
-        for i in range(num_vertices):
-            angle = (360 / num_vertices) * i
-            radius_variation = random.uniform(0.8, 1.2)
-            vertex_radius = self.radius * radius_variation
-            vertex = Vector2(vertex_radius, 0)
-            vertex.rotate_ip(angle)
-            self.vertices.append(vertex)
+        self.rotation_speed = self.rng.uniform(
+            -self.max_rotation_speed,
+            self.max_rotation_speed,
+        )
+
+        speed = self.rng.uniform(50, 150)
+        angle = self.rng.uniform(0, 360)
+        velocity = self.velocity
+        velocity.update(speed, 0)
+        velocity.rotate_ip(angle)
+        self.velocity = velocity
+
+        self.set_shape(shape_library.pick(size, self.rng))
+
+    def set_shape(self, shape_id: int) -> None:
+        self.shape_id: int = shape_id
+        self.outline: AsteroidShape = shape_library.shapes[shape_id]
+        self.radius = self.outline.radius
+        if Settings.use_sprite_atlas:
+            self.atlas = self.outline.get_atlas(self.color, 2)
 
     def update(self, dt: float, time_now: float) -> None:
-        self.time_now = time_now
         super().update(dt, time_now)
         self.angle += self.rotation_speed * dt
 
-    def draw(self, screen: Surface) -> None:
+    def draw(self, screen: Surface, alpha: float = 1.0) -> Rect:
+        if self.atlas is not None:
+            return self.atlas.draw(
+                screen,
+                self.render_position(alpha),
+                self.render_angle(alpha),
+            )
+
+        return polygon(screen, *self.shape(alpha))
+
+    def shape(self, alpha: float) -> Shape:
+        angle = self.render_angle(alpha)
+        position = self.render_position(alpha)
         rotated_vertices = []
-        for vertex in self.vertices:
+        for vertex in self.outline.vertices:
             rotated_vertex = vertex.copy()
-            rotated_vertex.rotate_ip(self.angle)
-            rotated_vertex += self.position
+            rotated_vertex.rotate_ip(angle)
+            rotated_vertex += position
             rotated_vertices.append(rotated_vertex)
+        return self.color, rotated_vertices, 2
+
+    def circle(self, alpha: float) -> Circle:
+        """Cheap stand-in for the outline at reduced quality."""
+        # Plain floats, the position may be the simulation's live vector.
+        position = self.render_position(alpha)
+        return self.color, (position.x, position.y), self.radius, 2
+
+    def sprite(self, alpha: float) -> tuple[Surface, tuple[int, int]] | None:
+        if self.atlas is None:
+            return None
+        return self.atlas.sprite(
+            self.render_position(alpha),
+            self.render_angle(alpha),
+        )
 
-        polygon(screen, (100, 100, 100), rotated_vertices, 2)
+    def new_fragment(self) -> 'Asteroid':
+        position = self.position
+        if self.pool is not None:
+            return self.pool.acquire(position.x, position.y, self.size - 1)
+        return Asteroid(position.x, position.y, self.size - 1, self.rng)
 
     def split(self) -> 'list[Asteroid]':
         if self.size > 1:
             fragments = []
             for _ in range(2):
-                fragment = Asteroid(
-                    self.position.x,
-                    self.position.y,
-                    self.size - 1,
-                )
-                fragment.velocity += Vector2(
-                    random.uniform(-100, 100),
-                    random.uniform(-100, 100),
-                )
+                fragment = self.new_fragment()
+                velocity = fragment.velocity
+                velocity.x += self.rng.uniform(-100, 100)
+                velocity.y += self.rng.uniform(-100, 100)
+                fragment.velocity = velocity
                 fragments.append(fragment)
             return fragments
         return []
@@ -0,0 +1,72 @@
+from random import Random
+
+from pygame.math import Vector2
+
+from components.game_objects.sprite_atlas import RotationAtlas, atlas_for
+from settings import Settings
+
+
+class AsteroidShape:
+    """One asteroid outline, shared by every asteroid drawn with it."""
+
+    def __init__(self, vertices: tuple[Vector2, ...], radius: float) -> None:
+        self.vertices: tuple[Vector2, ...] = vertices
+        self.radius: float = radius
+        self.atlas: RotationAtlas | None = None
+
+    def get_atlas(
+        self,
+        color: tuple[int, int, int],
+        width: int,
+    ) -> RotationAtlas:
+        if self.atlas is None:
+            self.atlas = atlas_for(self.vertices, color, width)
+        return self.atlas
+
+
+class ShapeLibrary:
+    """Pre-generated asteroid outlines, `per_size` of them per size tier.
+
+    Asteroids refer to a shape by its index in `shapes`, so spawning or
+    splitting one only draws that index from the RNG, and rotation atlases
+    are built per shape instead of per asteroid.
+    """
+
+    num_vertices: int = 8
+
+    def __init__(
+        self,
+        sizes: range,
+        per_size: int,
+        seed: int | None = None,
+    ) -> None:
+        rng = Random(seed)
+        self.shapes: list[AsteroidShape] = []
+        self.tiers: dict[int, range] = {}
+        for size in sizes:
+            start = len(self.shapes)
+            self.shapes.extend(
+                self.generate(size * 10, rng) for _ in range(per_size)
+            )
+            self.tiers[size] = range(start, len(self.shapes))
+
+    def generate(self, radius: float, rng: Random) -> AsteroidShape:
+        vertices = []
+        for i in range(self.num_vertices):
+            angle = (360 / self.num_vertices) * i
+            radius_variation = rng.uniform(0.8, 1.2)
+            vertex = Vector2(radius * radius_variation, 0)
+            vertex.rotate_ip(angle)
+            vertices.append(vertex)
+        return AsteroidShape(tuple(vertices), radius)
+
+    def pick(self, size: int, rng: Random) -> int:
+        tier = self.tiers[size]
+        return tier.start + rng.randrange(len(tier))
+
+
+shape_library = ShapeLibrary(
+    range(1, 4),
+    Settings.asteroid_shapes_per_size,
+    Settings.asteroid_shape_seed,
+)
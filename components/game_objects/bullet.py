@@ -1,4 +1,6 @@
-from pygame import Surface
+from functools import cache
+
+from pygame import RLEACCEL, Rect, Surface
 from pygame.draw import circle
 from pygame.math import Vector2
 
@@ -9,15 +11,33 @@ from settings import (
 )
 
 
+@cache
+def bullet_sprite(radius: int) -> Surface:
+    sprite = Surface((2 * radius + 1, 2 * radius + 1))
+    sprite.set_colorkey(Colors.black, RLEACCEL)
+    circle(sprite, Colors.yellow, (radius, radius), radius)
+    return sprite
+
+
 class Bullet(GameObject):
+    __slots__ = ('image', 'image_offset')
+
     def __init__(self, x: float, y: float, velocity: Vector2) -> None:
         super().__init__(x, y)
-        self.time_now: float = 0.0
-        self.velocity = velocity
-        self.radius: int = 2
+        self.reset(x, y, velocity)
+
+    def reset(self, x: float, y: float, velocity: Vector2) -> None:
+        super().reset(x, y)
+        radius = 2
+        self.radius: int = radius
+        self.image: Surface = bullet_sprite(radius)
+        self.image_offset: int = radius
+        own_velocity = self.velocity
+        own_velocity.update(velocity)
+        self.velocity = own_velocity
 
     def update(self, dt: float, time_now: float) -> None:
-        self.time_now = time_now
+        self.remember_state()
         self.position += self.velocity * dt
 
         if self.position.x < 0 or self.position.x > Settings.screen_size_x:
@@ -26,10 +46,22 @@ class Bullet(GameObject):
         if self.position.y < 0 or self.position.y > Settings.screen_size_y:
             self.alive = False
 
-    def draw(self, screen: Surface) -> None:
-        circle(
+    def draw(self, screen: Surface, alpha: float = 1.0) -> Rect:
+        position = self.render_position(alpha)
+        return circle(
             screen,
             Colors.yellow,
-            (int(self.position.x), int(self.position.y)),
+            (int(position.x), int(position.y)),
             self.radius,
         )
+
+    def sprite(self, alpha: float) -> tuple[Surface, tuple[int, int]]:
+        # Bullets never wrap, so no wrap check is needed to interpolate.
+        position = self.position
+        if alpha < 1.0:
+            position = self.previous_position.lerp(position, alpha)
+        offset = self.image_offset
+        return (
+            self.image,
+            (int(position.x) - offset, int(position.y) - offset),
+        )
@@ -0,0 +1,69 @@
+from typing import Generic, Iterator, TypeVar
+
+from components.game_objects.game_object import GameObject
+
+T = TypeVar('T', bound=GameObject)
+
+
+class EntityList(Generic[T]):
+    """Live game objects with spawns and despawns deferred to `apply`.
+
+    Spawning or despawning only queues the change, so it is safe while
+    the list is being iterated. `apply` runs between simulation steps: it
+    compacts dead objects out in place, keeping the order of the
+    survivors, releases them to their pools and appends the queued spawns.
+    """
+
+    def __init__(self) -> None:
+        self.items: list[T] = []
+        self.spawned: list[T] = []
+        self.has_despawns: bool = False
+
+    def __iter__(self) -> Iterator[T]:
+        return iter(self.items)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def spawn(self, obj: T) -> None:
+        self.spawned.append(obj)
+
+    def despawn(self, obj: T) -> None:
+        obj.alive = False
+        self.has_despawns = True
+
+    def apply(self) -> None:
+        items = self.items
+        if self.has_despawns:
+            alive_count = 0
+            for obj in items:
+                if obj.alive:
+                    items[alive_count] = obj
+                    alive_count += 1
+                else:
+                    obj.release()
+            del items[alive_count:]
+            self.has_despawns = False
+
+        if self.spawned:
+            items.extend(self.spawned)
+            self.spawned.clear()
+
+    def replace(self, objects: list[T]) -> None:
+        """Make `objects` the live ones, releasing those left out."""
+        kept = {id(obj) for obj in objects}
+        for obj in (*self.items, *self.spawned):
+            if id(obj) not in kept:
+                obj.release()
+        self.items[:] = objects
+        self.spawned.clear()
+        self.has_despawns = False
+
+    def clear(self) -> None:
+        for obj in self.items:
+            obj.release()
+        for obj in self.spawned:
+            obj.release()
+        self.items.clear()
+        self.spawned.clear()
+        self.has_despawns = False
@@ -0,0 +1,209 @@
+from heapq import heappop, heappush
+from random import Random
+
+import numpy as np
+from pygame.math import Vector2
+
+from components.game_objects.asteroid import Asteroid, default_rng
+from components.game_objects.bullet import Bullet
+from settings import Settings
+
+
+class EntityStore:
+    """Struct-of-arrays physics state for asteroids and bullets.
+
+    Every stored object owns one slot in the arrays. `update` moves,
+    rotates, wraps and culls all of them with a handful of vectorized
+    operations instead of one Python call per object.
+    """
+
+    def __init__(self, capacity: int = 256) -> None:
+        self.capacity: int = capacity
+        self.positions = np.zeros((capacity, 2))
+        self.previous_positions = np.zeros((capacity, 2))
+        self.velocities = np.zeros((capacity, 2))
+        self.angles = np.zeros(capacity)
+        self.previous_angles = np.zeros(capacity)
+        self.rotation_speeds = np.zeros(capacity)
+        self.radii = np.zeros(capacity)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.wraps = np.zeros(capacity, dtype=bool)
+        self.used = np.zeros(capacity, dtype=bool)
+
+        self.free_slots: list[int] = list(range(capacity))
+        self.slots_end: int = 0
+
+    def __len__(self) -> int:
+        return int(self.used[:self.slots_end].sum())
+
+    def grow(self) -> None:
+        old_capacity = self.capacity
+        self.capacity *= 2
+        for name in (
+            'positions',
+            'previous_positions',
+            'velocities',
+            'angles',
+            'previous_angles',
+            'rotation_speeds',
+            'radii',
+            'alive',
+            'wraps',
+            'used',
+        ):
+            old = getattr(self, name)
+            new = np.zeros((self.capacity, *old.shape[1:]), dtype=old.dtype)
+            new[:old_capacity] = old
+            setattr(self, name, new)
+
+        for slot in range(old_capacity, self.capacity):
+            heappush(self.free_slots, slot)
+
+    def allocate(self, wraps: bool) -> int:
+        if not self.free_slots:
+            self.grow()
+
+        slot = heappop(self.free_slots)
+        self.used[slot] = True
+        self.alive[slot] = True
+        self.wraps[slot] = wraps
+        self.slots_end = max(self.slots_end, slot + 1)
+        return slot
+
+    def release(self, slot: int) -> None:
+        self.used[slot] = False
+        self.alive[slot] = False
+        self.positions[slot] = 0
+        self.velocities[slot] = 0
+        self.angles[slot] = 0
+        self.rotation_speeds[slot] = 0
+        heappush(self.free_slots, slot)
+
+        while self.slots_end > 0 and not self.used[self.slots_end - 1]:
+            self.slots_end -= 1
+
+    def clear(self) -> None:
+        for slot in np.flatnonzero(self.used[:self.slots_end]):
+            self.release(int(slot))
+
+    def update(self, dt: float) -> None:
+        end = self.slots_end
+        if end == 0:
+            return
+
+        self.previous_positions[:end] = self.positions[:end]
+        self.previous_angles[:end] = self.angles[:end]
+
+        positions = self.positions[:end]
+        positions += self.velocities[:end] * dt
+        self.angles[:end] += self.rotation_speeds[:end] * dt
+
+        x = positions[:, 0]
+        y = positions[:, 1]
+        used = self.used[:end]
+        wraps = used & self.wraps[:end]
+
+        x[wraps & (x < 0)] = Settings.screen_size_x
+        x[wraps & (x > Settings.screen_size_x)] = 0
+        y[wraps & (y < 0)] = Settings.screen_size_y
+        y[wraps & (y > Settings.screen_size_y)] = 0
+
+        out_of_bounds = (
+            (x < 0)
+            | (x > Settings.screen_size_x)
+            | (y < 0)
+            | (y > Settings.screen_size_y)
+        )
+        self.alive[:end][used & ~self.wraps[:end] & out_of_bounds] = False
+
+
+def stored_vector(name: str) -> property:
+    def getter(self: 'StoredGameObject') -> Vector2:
+        row = getattr(self.store, name)[self.slot]
+        return Vector2(row[0], row[1])
+
+    def setter(self: 'StoredGameObject', value: Vector2) -> None:
+        getattr(self.store, name)[self.slot] = value
+
+    return property(getter, setter)
+
+
+def stored_scalar(name: str, cast: type) -> property:
+    def getter(self: 'StoredGameObject') -> float:
+        return cast(getattr(self.store, name)[self.slot])
+
+    def setter(self: 'StoredGameObject', value: float) -> None:
+        getattr(self.store, name)[self.slot] = value
+
+    return property(getter, setter)
+
+
+class StoredGameObject:
+    """Mixin turning a game object into a thin proxy over a store slot.
+
+    `position` and `velocity` return copies, so they have to be assigned
+    back as a whole; in-place `Vector2` operations on them are lost.
+    """
+
+    __slots__ = ()
+
+    wraps: bool = True
+
+    position = stored_vector('positions')
+    previous_position = stored_vector('previous_positions')
+    velocity = stored_vector('velocities')
+    angle = stored_scalar('angles', float)
+    previous_angle = stored_scalar('previous_angles', float)
+    rotation_speed = stored_scalar('rotation_speeds', float)
+    radius = stored_scalar('radii', float)
+    alive = stored_scalar('alive', bool)
+
+    def attach(self, store: EntityStore) -> None:
+        self.store: EntityStore = store
+        self.slot: int = store.allocate(self.wraps)
+
+    def reset(self, *args: object) -> None:
+        if self.slot < 0:
+            self.slot = self.store.allocate(self.wraps)
+        super().reset(*args)
+
+    def update(self, dt: float, time_now: float) -> None:
+        pass
+
+    def release(self) -> None:
+        self.store.release(self.slot)
+        self.slot = -1
+        super().release()
+
+
+class StoredAsteroid(StoredGameObject, Asteroid):
+    __slots__ = ('store', 'slot')
+
+    wraps = True
+
+    def __init__(
+        self,
+        store: EntityStore,
+        x: float,
+        y: float,
+        size: int = 3,
+        rng: Random = default_rng,
+    ) -> None:
+        self.attach(store)
+        super().__init__(x, y, size, rng)
+
+
+class StoredBullet(StoredGameObject, Bullet):
+    __slots__ = ('store', 'slot')
+
+    wraps = False
+
+    def __init__(
+        self,
+        store: EntityStore,
+        x: float,
+        y: float,
+        velocity: Vector2,
+    ) -> None:
+        self.attach(store)
+        super().__init__(x, y, velocity)
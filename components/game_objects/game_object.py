@@ -1,20 +1,69 @@
-from pygame import Surface
+from math import sqrt
+from typing import TYPE_CHECKING
+
+from pygame import Rect, Surface
 from pygame.math import Vector2
 
 from settings import Settings
 
+if TYPE_CHECKING:
+    from components.game_objects.pool import ObjectPool
+
+# Polygon color, points on the screen and line width, 0 to fill.
+Shape = tuple[tuple[int, int, int], list[Vector2], int]
+# Circle color, center on the screen, radius and line width.
+Circle = tuple[tuple[int, int, int], tuple[float, float], float, int]
+
 
 class GameObject:
+    __slots__ = (
+        'position',
+        'velocity',
+        'angle',
+        'radius',
+        'alive',
+        'pool',
+        'previous_position',
+        'previous_angle',
+    )
+
     def __init__(self, x: float, y: float) -> None:
-        self.time_now: float = 0.0
         self.position: Vector2 = Vector2(x, y)
         self.velocity: Vector2 = Vector2(0, 0)
         self.angle = 0
         self.radius = 20
         self.alive = True
+        self.pool: ObjectPool | None = None
+        self.previous_position: Vector2 = Vector2(x, y)
+        self.previous_angle: float = 0
+
+    def reset(self, x: float, y: float) -> None:
+        # Mutate and assign back, so store-backed proxies see the change.
+        position = self.position
+        position.update(x, y)
+        self.position = position
+
+        velocity = self.velocity
+        velocity.update(0, 0)
+        self.velocity = velocity
+
+        self.angle = 0
+        self.alive = True
+
+        previous_position = self.previous_position
+        previous_position.update(x, y)
+        self.previous_position = previous_position
+        self.previous_angle = 0
+
+    def remember_state(self) -> None:
+        self.previous_position.update(self.position)
+        self.previous_angle = self.angle
 
     def update(self, dt: float, time_now: float) -> None:
-        self.time_now = time_now
+        self.remember_state()
+        self.move(dt)
+
+    def move(self, dt: float) -> None:
         self.position += self.velocity * dt
 
         if self.position.x < 0:
@@ -26,9 +75,80 @@ class GameObject:
         elif self.position.y > Settings.screen_size_y:
             self.position.y = 0
 
-    def draw(self, screen: Surface) -> None:
+    def render_position(self, alpha: float) -> Vector2:
+        position = self.position
+        if alpha >= 1.0:
+            return position
+
+        previous = self.previous_position
+        if (
+            abs(position.x - previous.x) > Settings.screen_size_x / 2
+            or abs(position.y - previous.y) > Settings.screen_size_y / 2
+        ):
+            # Wrapped around the screen edge during the last tick.
+            return position
+        return previous.lerp(position, alpha)
+
+    def render_angle(self, alpha: float) -> float:
+        if alpha >= 1.0:
+            return self.angle
+        return self.previous_angle + (self.angle - self.previous_angle) * alpha
+
+    def draw(self, screen: Surface, alpha: float = 1.0) -> Rect | None:
         pass
 
+    def sprite(self, alpha: float) -> tuple[Surface, tuple[int, int]] | None:
+        """Pre-rendered image and top left corner, None if drawn by hand."""
+        return None
+
+    def shape(self, alpha: float) -> Shape | None:
+        """Color, screen points and line width of a hand-drawn polygon."""
+        return None
+
+    def release(self) -> None:
+        if self.pool is not None:
+            self.pool.release(self)
+
     def check_collision(self, other: 'GameObject') -> bool:
-        distance = self.position.distance_to(other.position)
-        return distance < (self.radius + other.radius)
+        distance_squared = self.position.distance_squared_to(other.position)
+        return distance_squared < (self.radius + other.radius) ** 2
+
+    def swept_collision_time(self, other: 'GameObject') -> float | None:
+        """Earliest fraction of the last tick this object touched `other`.
+
+        This object is swept from its previous to its current position,
+        `other` is taken at its current position. Objects that overlap at
+        the end of the tick always collide, as with `check_collision`.
+        """
+        start = self.previous_position
+        end = self.position
+        center = other.position
+        reach = self.radius + other.radius
+
+        # Bounding box reject before solving anything.
+        if (
+            center.x + reach < min(start.x, end.x)
+            or center.x - reach > max(start.x, end.x)
+            or center.y + reach < min(start.y, end.y)
+            or center.y - reach > max(start.y, end.y)
+        ):
+            return None
+
+        offset_x = start.x - center.x
+        offset_y = start.y - center.y
+        c = offset_x * offset_x + offset_y * offset_y - reach * reach
+        if c < 0:
+            return 0.0
+
+        move_x = end.x - start.x
+        move_y = end.y - start.y
+        a = move_x * move_x + move_y * move_y
+        b = 2 * (offset_x * move_x + offset_y * move_y)
+        discriminant = b * b - 4 * a * c
+        if a == 0 or discriminant < 0:
+            return None
+
+        time = (-b - sqrt(discriminant)) / (2 * a)
+        if 0 <= time <= 1:
+            return time
+        return None
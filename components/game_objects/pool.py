@@ -0,0 +1,51 @@
+from typing import Callable, Generic, TypeVar
+
+T = TypeVar('T')
+
+
+class ObjectPool(Generic[T]):
+    """Free list of game objects reused instead of reallocated.
+
+    Pooled objects must implement `reset` with the same arguments as
+    their factory, and hand themselves back through `release` once they
+    are removed from the game.
+    """
+
+    def __init__(self, factory: Callable[..., T], max_size: int) -> None:
+        self.factory: Callable[..., T] = factory
+        self.max_size: int = max_size
+        self.free: list[T] = []
+
+        self.hits: int = 0
+        self.misses: int = 0
+        self.in_use: int = 0
+        self.high_water: int = 0
+
+    def acquire(self, *args: object) -> T:
+        if self.free:
+            obj = self.free.pop()
+            obj.reset(*args)
+            self.hits += 1
+        else:
+            obj = self.factory(*args)
+            obj.pool = self
+            self.misses += 1
+
+        self.in_use += 1
+        if self.in_use > self.high_water:
+            self.high_water = self.in_use
+        return obj
+
+    def release(self, obj: T) -> None:
+        self.in_use -= 1
+        if len(self.free) < self.max_size:
+            self.free.append(obj)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'in_use': self.in_use,
+            'free': len(self.free),
+            'high_water': self.high_water,
+        }
@@ -1,30 +1,64 @@
-from pygame import Surface
+from pygame import Rect, Surface
 from pygame.draw import polygon
 from pygame.math import Vector2
 
 from components.game_objects.bullet import Bullet
-from components.game_objects.game_object import GameObject
+from components.game_objects.entity_list import EntityList
+from components.game_objects.game_object import GameObject, Shape
+from components.game_objects.pool import ObjectPool
+from components.game_objects.sprite_atlas import RotationAtlas, atlas_for
 from settings import (
+    Colors,
     DefaultStats,
+    Settings,
     UserStats,
 )
 
 
 class Ship(GameObject):
-    def __init__(self, x: float, y: float) -> None:
+    __slots__ = (
+        'stats',
+        'bullet_pool',
+        'bullet_velocity',
+        'time_now',
+        'thrust',
+        'rotation_speed',
+        'bullets',
+        'cur_bullets',
+        'last_shot_time',
+        'last_reload_time',
+        'is_reloading',
+        'atlas',
+    )
+
+    def __init__(
+        self,
+        x: float,
+        y: float,
+        stats: UserStats,
+        bullet_pool: ObjectPool[Bullet] | None = None,
+    ) -> None:
         super().__init__(x, y)
+        self.stats: UserStats = stats
+        self.bullet_pool: ObjectPool[Bullet] | None = bullet_pool
+        self.bullet_velocity: Vector2 = Vector2()
         self.time_now: float = 0.0
         self.radius: float = 10.0
         self.thrust: float = 0.0
         self.rotation_speed: float = 0.0
-        self.bullets: list[Bullet] = []
+        self.bullets: EntityList[Bullet] = EntityList()
         self.cur_bullets = DefaultStats.max_bullets
         self.last_shot_time: float = 0.0
         self.last_reload_time: float = 0.0
         self.is_reloading: bool = False
 
+        self.atlas: RotationAtlas | None = None
+        if Settings.use_sprite_atlas:
+            self.atlas = atlas_for(self.hull_points(), Colors.white)
+
     def update(self, dt: float, time_now: float) -> None:
         self.time_now = time_now
+        self.remember_state()
         self.angle += self.rotation_speed * dt
 
         if self.thrust > 0:
@@ -32,14 +66,15 @@ class Ship(GameObject):
             thrust_vector.rotate_ip(self.angle)
             self.velocity += thrust_vector * dt
 
-        self.velocity *= 0.99
+        # 1% drag per 1/60 s, independent of the tick rate.
+        self.velocity *= 0.99 ** (dt * 60)
 
-        super().update(dt, self.time_now)
+        self.move(dt)
 
-        for bullet in self.bullets[:]:
+        for bullet in self.bullets:
             bullet.update(dt, self.time_now)
             if not bullet.alive:
-                self.bullets.remove(bullet)
+                self.bullets.despawn(bullet)
 
         if (
             self.is_reloading
@@ -59,36 +94,62 @@ class Ship(GameObject):
 
     def shoot(self) -> None:
         if self.can_shoot():
-            bullet_velocity = Vector2(0, -300)
+            bullet_velocity = self.bullet_velocity
+            bullet_velocity.update(0, -300)
             bullet_velocity.rotate_ip(self.angle)
             bullet_velocity += self.velocity
 
-            bullet = Bullet(self.position.x, self.position.y, bullet_velocity)
-            self.bullets.append(bullet)
+            self.bullets.spawn(self.new_bullet(bullet_velocity))
             self.cur_bullets -= 1
 
+    def new_bullet(self, velocity: Vector2) -> Bullet:
+        position = self.position
+        if self.bullet_pool is not None:
+            return self.bullet_pool.acquire(position.x, position.y, velocity)
+        return Bullet(position.x, position.y, velocity)
+
+    def release(self) -> None:
+        self.bullets.clear()
+
     def start_reloading(self) -> None:
         if not self.is_reloading:
             self.last_reload_time = self.time_now
             self.is_reloading = True
 
     def end_reloading(self) -> None:
-        self.cur_bullets = UserStats.max_bullets
+        self.cur_bullets = self.stats.max_bullets
         self.is_reloading = False
 
-    def draw(self, screen: Surface) -> None:
-        points = [
+    def hull_points(self) -> list[Vector2]:
+        return [
             Vector2(0, -self.radius),
             Vector2(-self.radius//2, self.radius),
             Vector2(self.radius//2, self.radius),
         ]
 
-        rotated_points = []
-        for point in points:
-            point.rotate_ip(self.angle)
-            rotated_points.append(point + self.position)
+    def draw(self, screen: Surface, alpha: float = 1.0) -> Rect:
+        if self.atlas is not None:
+            return self.atlas.draw(
+                screen,
+                self.render_position(alpha),
+                self.render_angle(alpha),
+            )
 
-        polygon(screen, (255, 255, 255), rotated_points)
+        return polygon(screen, *self.shape(alpha))
 
-        for bullet in self.bullets:
-            bullet.draw(screen)
+    def shape(self, alpha: float) -> Shape:
+        angle = self.render_angle(alpha)
+        position = self.render_position(alpha)
+        rotated_points = []
+        for point in self.hull_points():
+            point.rotate_ip(angle)
+            rotated_points.append(point + position)
+        return Colors.white, rotated_points, 0
+
+    def sprite(self, alpha: float) -> tuple[Surface, tuple[int, int]] | None:
+        if self.atlas is None:
+            return None
+        return self.atlas.sprite(
+            self.render_position(alpha),
+            self.render_angle(alpha),
+        )
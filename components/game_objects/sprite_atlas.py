@@ -0,0 +1,92 @@
+from math import ceil
+from typing import Sequence
+from weakref import WeakValueDictionary
+
+from pygame import RLEACCEL, Rect, Surface
+from pygame.draw import polygon
+from pygame.math import Vector2
+
+from settings import Settings
+
+
+class RotationAtlas:
+    """A polygon pre-rendered at `angle_count` evenly spaced angles.
+
+    Drawing picks the frame closest to the requested angle and blits it,
+    instead of rotating and rasterizing the polygon every frame.
+    """
+
+    def __init__(
+        self,
+        vertices: Sequence[Vector2],
+        color: tuple[int, int, int],
+        width: int,
+        angle_count: int,
+    ) -> None:
+        self.angle_count: int = angle_count
+        self.angle_step: float = 360 / angle_count
+
+        extent = max(vertex.length() for vertex in vertices)
+        self.half_size: int = ceil(extent) + width + 1
+        size = 2 * self.half_size + 1
+        center = Vector2(self.half_size, self.half_size)
+
+        self.frames: list[Surface] = []
+        for i in range(angle_count):
+            angle = self.angle_step * i
+            frame = Surface((size, size))
+            frame.set_colorkey((0, 0, 0), RLEACCEL)
+            polygon(
+                frame,
+                color,
+                [vertex.rotate(angle) + center for vertex in vertices],
+                width,
+            )
+            self.frames.append(frame)
+
+    def frame(self, angle: float) -> Surface:
+        index = round(angle / self.angle_step) % self.angle_count
+        return self.frames[index]
+
+    def sprite(
+        self,
+        position: Vector2,
+        angle: float,
+    ) -> tuple[Surface, tuple[int, int]]:
+        return (
+            self.frame(angle),
+            (
+                round(position.x) - self.half_size,
+                round(position.y) - self.half_size,
+            ),
+        )
+
+    def draw(self, screen: Surface, position: Vector2, angle: float) -> Rect:
+        return screen.blit(*self.sprite(position, angle))
+
+
+atlases: WeakValueDictionary[tuple, RotationAtlas] = WeakValueDictionary()
+
+
+def atlas_for(
+    vertices: Sequence[Vector2],
+    color: tuple[int, int, int],
+    width: int = 0,
+) -> RotationAtlas:
+    """Return the shared atlas for this shape, building it if needed."""
+    key = (
+        tuple((round(vertex.x, 3), round(vertex.y, 3)) for vertex in vertices),
+        color,
+        width,
+        Settings.sprite_atlas_angles,
+    )
+    atlas = atlases.get(key)
+    if atlas is None:
+        atlas = RotationAtlas(
+            vertices,
+            color,
+            width,
+            Settings.sprite_atlas_angles,
+        )
+        atlases[key] = atlas
+    return atlas
@@ -0,0 +1,186 @@
+from pathlib import Path
+from struct import Struct
+from typing import TYPE_CHECKING, BinaryIO, Iterator, Sequence
+from zlib import crc32
+
+from components.inputs import KEY_NAMES
+from settings import UserStats
+
+if TYPE_CHECKING:
+    from components.game import Game
+
+
+LOG_MAGIC: bytes = b'SMIL'
+LOG_VERSION: int = 2
+
+# Header: magic, version, RNG seed, checksum interval in ticks and the
+# stress mode population, 0 when off.
+HEADER = Struct('<4sBQHI')
+KIND = Struct('<B')
+
+RECORD_TICK: int = 0
+RECORD_DT: int = 1
+RECORD_RESUME: int = 2
+RECORD_CHECKSUM: int = 3
+
+RECORDS: dict[int, Struct] = {
+    # Held and pressed (KEYDOWN) keys as bit sets over `KEY_NAMES`.
+    RECORD_TICK: Struct('<BB'),
+    # New `dt`, written only when it changes.
+    RECORD_DT: Struct('<d'),
+    # Game clock and `UserStats` whenever the game is entered from a menu.
+    RECORD_RESUME: Struct('<diiii'),
+    RECORD_CHECKSUM: Struct('<I'),
+}
+
+LOGGED_KEYS: tuple[int, ...] = tuple(KEY_NAMES.values())
+
+
+def state_checksum(game: 'Game') -> int:
+    state = [
+        game.stats.level,
+        game.stats.credits,
+        game.stats.lives,
+        game.stats.max_bullets,
+        game.ship.cur_bullets,
+        round(game.ship.position.x, 3),
+        round(game.ship.position.y, 3),
+    ]
+    for obj in (*game.asteroids, *game.ship.bullets):
+        state.append(round(obj.position.x, 3))
+        state.append(round(obj.position.y, 3))
+    return crc32(repr(state).encode())
+
+
+def encode_held(keys: Sequence[bool]) -> int:
+    return sum(1 << i for i, key in enumerate(LOGGED_KEYS) if keys[key])
+
+
+def encode_pressed(pressed: set[int]) -> int:
+    return sum(1 << i for i, key in enumerate(LOGGED_KEYS) if key in pressed)
+
+
+def decode_keys(bits: int) -> set[int]:
+    return {key for i, key in enumerate(LOGGED_KEYS) if bits & (1 << i)}
+
+
+class InputLogWriter:
+    """Records the inputs of every game tick into a compact binary log.
+
+    A tick costs three bytes, `dt` is only written when it changes and a
+    resume record with the game clock and `UserStats` is written whenever
+    the clock jumps, i.e. after time spent in menus. Every
+    `checksum_interval` ticks the game state checksum is appended so a
+    replay can tell where it diverged.
+    """
+
+    def __init__(
+        self,
+        file: BinaryIO,
+        seed: int,
+        checksum_interval: int,
+        stress_population: int = 0,
+    ) -> None:
+        self.file: BinaryIO = file
+        self.checksum_interval: int = checksum_interval
+        self.ticks: int = 0
+        self.dt: float | None = None
+        self.time_now: float | None = None
+
+        self.file.write(
+            HEADER.pack(
+                LOG_MAGIC,
+                LOG_VERSION,
+                seed,
+                checksum_interval,
+                stress_population,
+            ),
+        )
+
+    @classmethod
+    def open(
+        cls,
+        path: Path,
+        seed: int,
+        checksum_interval: int,
+        stress_population: int = 0,
+    ) -> 'InputLogWriter':
+        return cls(
+            open(path, 'wb'),
+            seed,
+            checksum_interval,
+            stress_population,
+        )
+
+    def write(self, kind: int, *values: int | float) -> None:
+        self.file.write(KIND.pack(kind) + RECORDS[kind].pack(*values))
+
+    def record_tick(
+        self,
+        dt: float,
+        time_now: float,
+        keys: Sequence[bool],
+        pressed: set[int],
+        stats: UserStats,
+    ) -> None:
+        """Record the inputs of a tick about to run from `time_now`."""
+        if time_now != self.time_now:
+            self.write(
+                RECORD_RESUME,
+                time_now,
+                stats.level,
+                stats.credits,
+                stats.lives,
+                stats.max_bullets,
+            )
+        if dt != self.dt:
+            self.write(RECORD_DT, dt)
+            self.dt = dt
+
+        self.write(RECORD_TICK, encode_held(keys), encode_pressed(pressed))
+        self.time_now = time_now + dt
+
+    def record_state(self, game: 'Game') -> None:
+        """Checksum the game after the update of the recorded tick."""
+        self.ticks += 1
+        if self.ticks % self.checksum_interval == 0:
+            self.write(RECORD_CHECKSUM, state_checksum(game))
+
+    def close(self) -> None:
+        self.file.close()
+
+
+class InputLog:
+    """A recorded input log loaded into memory."""
+
+    def __init__(self, data: bytes) -> None:
+        (
+            magic,
+            version,
+            seed,
+            checksum_interval,
+            stress_population,
+        ) = HEADER.unpack_from(data)
+        if magic != LOG_MAGIC or version != LOG_VERSION:
+            raise ValueError('Not a Space Miner input log of a known version')
+
+        self.seed: int = seed
+        self.checksum_interval: int = checksum_interval
+        self.stress_population: int = stress_population
+        self.data: bytes = data
+
+    @classmethod
+    def load(cls, path: Path) -> 'InputLog':
+        with open(path, 'rb') as file:
+            return cls(file.read())
+
+    def records(self) -> Iterator[tuple[int, tuple]]:
+        offset = HEADER.size
+        while offset < len(self.data):
+            (kind,) = KIND.unpack_from(self.data, offset)
+            offset += KIND.size
+            record = RECORDS.get(kind)
+            if record is None:
+                raise ValueError(f'Unknown input log record {kind}')
+            yield kind, record.unpack_from(self.data, offset)
+            offset += record.size
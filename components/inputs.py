@@ -0,0 +1,122 @@
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, Protocol
+
+from pygame import (
+    K_BACKSPACE,
+    K_ESCAPE,
+    K_LEFT,
+    K_RIGHT,
+    K_SPACE,
+    K_UP,
+    K_r,
+)
+from pygame.math import Vector2
+
+if TYPE_CHECKING:
+    from components.game import Game
+
+
+KEY_NAMES: dict[str, int] = {
+    'left': K_LEFT,
+    'right': K_RIGHT,
+    'up': K_UP,
+    'space': K_SPACE,
+    'r': K_r,
+    'escape': K_ESCAPE,
+    'backspace': K_BACKSPACE,
+}
+
+
+class KeyState:
+    """Stand-in for `pygame.key.get_pressed()` built from a set of keys."""
+
+    def __init__(self, keys: Iterable[int] = ()) -> None:
+        self.keys: frozenset[int] = frozenset(keys)
+
+    def __getitem__(self, key: int) -> bool:
+        return key in self.keys
+
+
+class InputSource(Protocol):
+    def next_frame(self, frame: int) -> tuple[KeyState, set[int]]:
+        ...
+
+
+class InputScript:
+    """Keyboard input read from a text script.
+
+    Each line is `<frame> <key> ...`. Plain keys are held from that frame
+    until the next line, keys prefixed with `+` are pressed (KEYDOWN) on
+    that frame only. Key names are the keys of `KEY_NAMES`, `#` starts a
+    comment. For example:
+
+        0 up space
+        120 left space
+        300 +r
+    """
+
+    def __init__(self, lines: Iterable[str]) -> None:
+        self.entries: dict[int, tuple[KeyState, set[int]]] = {}
+        for line in lines:
+            tokens = line.split('#', 1)[0].split()
+            if not tokens:
+                continue
+
+            held: set[int] = set()
+            pressed: set[int] = set()
+            for token in tokens[1:]:
+                if token.startswith('+'):
+                    pressed.add(KEY_NAMES[token[1:].lower()])
+                else:
+                    held.add(KEY_NAMES[token.lower()])
+            self.entries[int(tokens[0])] = (KeyState(held), pressed)
+
+        self.keys: KeyState = KeyState()
+
+    @classmethod
+    def from_file(cls, path: Path) -> 'InputScript':
+        with open(path, encoding='utf-8') as file:
+            return cls(file)
+
+    def next_frame(self, frame: int) -> tuple[KeyState, set[int]]:
+        entry = self.entries.get(frame)
+        if entry is None:
+            return self.keys, set()
+
+        self.keys, pressed = entry
+        return self.keys, set(pressed)
+
+
+class AutoPilot:
+    """Simple built-in pilot: turn to the nearest asteroid and shoot."""
+
+    def __init__(self, game: 'Game') -> None:
+        self.game: Game = game
+
+    def next_frame(self, frame: int) -> tuple[KeyState, set[int]]:
+        ship = self.game.ship
+        if not self.game.asteroids:
+            return KeyState(), set()
+
+        target = min(
+            self.game.asteroids,
+            key=lambda asteroid: ship.position.distance_squared_to(
+                asteroid.position,
+            ),
+        )
+        target_angle = Vector2(0, -1).angle_to(target.position - ship.position)
+        angle_error = (target_angle - ship.angle + 180) % 360 - 180
+
+        held: set[int] = set()
+        pressed: set[int] = set()
+        if angle_error > 5:
+            held.add(K_RIGHT)
+        elif angle_error < -5:
+            held.add(K_LEFT)
+
+        if ship.cur_bullets == 0 and not ship.is_reloading:
+            pressed.add(K_r)
+        elif abs(angle_error) < 10:
+            held.add(K_SPACE)
+
+        return KeyState(held), pressed
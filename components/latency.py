@@ -0,0 +1,105 @@
+from collections import deque
+from time import perf_counter, sleep
+
+import numpy as np
+
+
+class FramePacer:
+    """Frame cadence that starts each frame's work as late as possible.
+
+    `Clock.tick` sleeps at the start of a frame and then runs input,
+    simulation, drawing and the flip back to back, so input is sampled a
+    whole frame of work before it is shown. The pacer keeps a fixed grid of
+    frame deadlines and sleeps until the slowest of the last `history`
+    frames' work, plus `margin`, would still end on the deadline. Input
+    is then sampled right before the work that uses it.
+    """
+
+    def __init__(
+        self,
+        frame_rate: int,
+        margin: float,
+        history: int = 30,
+    ) -> None:
+        self.frame_time: float = 1 / frame_rate
+        self.margin: float = margin
+        self.work_times: deque[float] = deque(maxlen=history)
+        self.started_at: float = perf_counter()
+        self.deadline: float = self.started_at
+
+    def work_estimate(self) -> float:
+        return max(self.work_times, default=0.0) + self.margin
+
+    def wait(self) -> float:
+        """Sleep until the next frame's work has to start.
+
+        Returns the seconds since the previous frame's work started.
+        """
+        self.deadline += self.frame_time
+        now = perf_counter()
+        start_at = self.deadline - self.work_estimate()
+        if start_at > now:
+            sleep(start_at - now)
+            now = perf_counter()
+        elif now > self.deadline:
+            # Behind schedule, start a new grid from here.
+            self.deadline = now
+
+        elapsed = now - self.started_at
+        self.started_at = now
+        return elapsed
+
+    def end_work(self) -> None:
+        self.work_times.append(perf_counter() - self.started_at)
+
+
+class InputLatencyProbe:
+    """Time from dequeuing each KEYDOWN to the flip of the frame using it.
+
+    Pygame events carry no arrival time, so a key is timed from the event
+    poll that returned it. The key arrived after the previous poll, so the
+    time since that poll is kept as well, as an upper bound.
+    """
+
+    def __init__(self) -> None:
+        self.previous_poll_at: float = perf_counter()
+        self.pending: list[tuple[float, float]] = []
+        self.consumed: list[tuple[float, float]] = []
+        self.latencies: list[tuple[float, float]] = []
+
+    def poll(self, poll_at: float, key_downs: int) -> None:
+        for _ in range(key_downs):
+            self.pending.append((poll_at, self.previous_poll_at))
+        self.previous_poll_at = poll_at
+
+    def consume(self) -> None:
+        """Mark the pending keys as used by the tick about to run."""
+        self.consumed.extend(self.pending)
+        self.pending.clear()
+
+    def frame_shown(self) -> None:
+        shown_at = perf_counter()
+        for poll_at, previous_poll_at in self.consumed:
+            self.latencies.append(
+                (shown_at - poll_at, shown_at - previous_poll_at),
+            )
+        self.consumed.clear()
+
+    def report(self) -> list[str]:
+        if not self.latencies:
+            return ['Input latency: no key presses recorded']
+
+        latencies = np.array(self.latencies) * 1000
+        lines = [
+            f'Input to flip latency over {len(latencies)} key presses, ms',
+        ]
+        for name, values in (
+            ('since poll', latencies[:, 0]),
+            ('since previous poll', latencies[:, 1]),
+        ):
+            p50, p95, p99 = np.percentile(values, (50, 95, 99))
+            lines.append(
+                f'{name:<20} p50 {p50:6.2f}  p95 {p95:6.2f}  '
+                f'p99 {p99:6.2f}  max {values.max():6.2f}',
+            )
+        return lines
@@ -0,0 +1,82 @@
+import sys
+from typing import TYPE_CHECKING, Iterable
+
+from pygame.math import Vector2
+
+from components.game_objects.game_object import GameObject
+
+if TYPE_CHECKING:
+    from components.game import Game
+
+# Values an object owns outright. Anything else it refers to, like pools,
+# shapes, atlases or the RNG, is shared and not counted.
+OWNED_TYPES: tuple[type, ...] = (Vector2, float)
+
+
+def slot_values(obj: object) -> list[object]:
+    """Values stored in the slots of `obj`, skipping properties."""
+    values = []
+    for klass in type(obj).__mro__:
+        slots = klass.__dict__.get('__slots__', ())
+        for name in (slots,) if isinstance(slots, str) else slots:
+            try:
+                values.append(klass.__dict__[name].__get__(obj, klass))
+            except AttributeError:
+                pass
+    return values
+
+
+def object_bytes(obj: GameObject) -> int:
+    """Bytes of `obj` plus the vectors and floats it owns."""
+    size = sys.getsizeof(obj)
+    values = slot_values(obj)
+    instance_dict = getattr(obj, '__dict__', None)
+    if instance_dict is not None:
+        size += sys.getsizeof(instance_dict)
+        values.extend(instance_dict.values())
+
+    for value in values:
+        if isinstance(value, OWNED_TYPES):
+            size += sys.getsizeof(value)
+    return size
+
+
+def entity_memory(game: 'Game') -> dict[str, tuple[int, int]]:
+    """Count and bytes of every entity type of `game`, pools included."""
+    groups: dict[str, Iterable[GameObject]] = {
+        'ship': (game.ship,),
+        'bullets': game.ship.bullets,
+        'asteroids': game.asteroids,
+        'pooled bullets': game.bullet_pool.free,
+        'pooled asteroids': game.asteroid_pool.free,
+    }
+    memory = {}
+    for name, objects in groups.items():
+        sizes = [object_bytes(obj) for obj in objects]
+        memory[name] = len(sizes), sum(sizes)
+
+    store = game.entity_store
+    if store is not None:
+        memory['entity store arrays'] = (
+            len(store),
+            sum(
+                value.nbytes
+                for value in vars(store).values()
+                if hasattr(value, 'nbytes')
+            ),
+        )
+    return memory
+
+
+def memory_report(game: 'Game') -> list[str]:
+    memory = entity_memory(game)
+    lines = []
+    for name, (count, size) in memory.items():
+        per_entity = size / count if count else 0
+        lines.append(
+            f'{name:<20} {count:>7} x {per_entity:>6.0f} B '
+            f'= {size / 1024:>9.1f} KiB',
+        )
+    total = sum(size for _, size in memory.values())
+    lines.append(f'{"total":<20} {total / 1024:>29.1f} KiB')
+    return lines
@@ -9,9 +9,10 @@ from pygame import (
     Surface,
 )
 from pygame.draw import rect
-from pygame.font import SysFont
 
 from abstractions.apps import AppComponent
+from components.fonts import fonts
+from components.text_cache import HudLabel, text_cache
 from settings import (
     AppEvents,
     Colors,
@@ -28,16 +29,38 @@ class MenuItem:
 
 
 class BaseMenu(AppComponent):
-    def __init__(self, screen: Surface) -> None:
+    def __init__(self, screen: Surface, stats: UserStats) -> None:
         self.screen: Surface = screen
+        self.stats: UserStats = stats
         self.event: AppEvents = AppEvents.no_event
         self.time_now: float = 0.0
 
         self.menu_title: str = ''
 
-        self.font = SysFont('Arial', 24)
-        self.font_title = SysFont('Arial', 62, True)
-        self.font_small = SysFont('Arial', 18)
+        self.font = fonts.get('Arial', 24)
+        self.font_title = fonts.get('Arial', 62, True)
+        self.font_small = fonts.get('Arial', 18)
+
+        self.level_label = HudLabel(
+            self.font,
+            Colors.white,
+            lambda level: f'Level: {level}',
+        )
+        self.credits_label = HudLabel(
+            self.font,
+            Colors.white,
+            lambda credits: f'Credits: {credits}',
+        )
+        self.lives_label = HudLabel(
+            self.font,
+            Colors.white,
+            lambda lives: f'Lives: {lives}',
+        )
+        self.bullets_label = HudLabel(
+            self.font,
+            Colors.white,
+            lambda max_bullets: f'Bullets: {max_bullets}',
+        )
 
         self.menu_vertical_shift = 0
         self.menu_items: tuple[MenuItem, ...] = ()
@@ -50,6 +73,12 @@ class BaseMenu(AppComponent):
         self.is_draw_help: bool = False
         self.selected_menu_item: int = 0
 
+        self.layer: Surface | None = None
+        self.layer_drawn_state: tuple = ()
+        self.static_layer: Surface | None = None
+        self.static_layer_title: str = ''
+        self.help_layer: Surface | None = None
+
     def select_next_menu_item(self) -> None:
         if self.selected_menu_item == 0:
             self.selected_menu_item = len(self.menu_items)-1
@@ -74,47 +103,37 @@ class BaseMenu(AppComponent):
         elif K_DOWN in inputs:
             self.select_prev_menu_item()
 
-    def draw_stats(self) -> None:
-        level_text = self.font.render(
-            f'Level: {UserStats.level}',
-            True,
-            Colors.white,
-        )
-        score_text = self.font.render(
-            f'Credits: {UserStats.credits}',
-            True,
-            Colors.white,
-        )
-        lives_text = self.font.render(
-            f'Lives: {UserStats.lives}',
-            True,
-            Colors.white,
+    def stats_state(self) -> tuple[int, ...]:
+        return (
+            self.stats.level,
+            self.stats.credits,
+            self.stats.lives,
+            self.stats.max_bullets,
         )
-        bullets_text = self.font.render(
-            f'Bullets: {UserStats.max_bullets}',
-            True,
-            Colors.white,
+
+    def layer_state(self) -> tuple:
+        return (
+            self.selected_menu_item,
+            self.is_draw_help,
+            self.is_draw_stats,
+            tuple(menu_item.text for menu_item in self.menu_items),
+            self.stats_state() if self.is_draw_stats else None,
         )
-        self.screen.blit(level_text, (10, 10))
-        self.screen.blit(score_text, (10, 40))
-        self.screen.blit(lives_text, (10, 70))
-        self.screen.blit(bullets_text, (10, 100))
 
-    def draw_help(self) -> None:
-        x0 = Settings.screen_center[0] - 300
-        y0 = Settings.screen_center[1] - 200
+    def draw_stats(self, surface: Surface) -> None:
+        level_text = self.level_label.render(self.stats.level)
+        score_text = self.credits_label.render(self.stats.credits)
+        lives_text = self.lives_label.render(self.stats.lives)
+        bullets_text = self.bullets_label.render(self.stats.max_bullets)
+        surface.blit(level_text, (10, 10))
+        surface.blit(score_text, (10, 40))
+        surface.blit(lives_text, (10, 70))
+        surface.blit(bullets_text, (10, 100))
+
+    def build_help_layer(self) -> Surface:
+        help_layer = Surface((600, 400))
+        help_layer.fill(Colors.blue_dark)
 
-        help_rect = Rect(
-                x0,
-                y0,
-                600,
-                400,
-            )
-        rect(
-            self.screen,
-            Colors.blue_dark,
-            help_rect,
-        )
         help_text = (
             'Shoot asteroids, yearn credits, buy upgrades.\n'
              '\n'
@@ -123,39 +142,50 @@ class BaseMenu(AppComponent):
              '"Space" to shoot.\n'
              '"R" to reload.\n'
              '"ESC" to pause the game\n'
+             '"Backspace" to rewind time.\n'
              '\n'
              'Have fun!'
-             '\n\n\n\n'
+             '\n\n\n'
              'Press "Enter" to close this window.'
         )
         lines = help_text.split('\n')
         y_offset = 0
         for line in lines:
-            help_text = self.font_small.render(
+            help_text = text_cache.render(
+                self.font_small,
                 line,
-                True,
                 Colors.gray,
             )
             help_rect = help_text.get_rect(center=(
-                Settings.screen_center[0],
-                y0+50+y_offset,
+                help_layer.get_width() // 2,
+                50+y_offset,
             ))
-            self.screen.blit(help_text, help_rect)
+            help_layer.blit(help_text, help_rect)
             y_offset += int(self.font_small.get_height() * 1.2)
 
-    def draw_title(self) -> None:
-        title_text = self.font_title.render(
+        return help_layer
+
+    def draw_help(self, surface: Surface) -> None:
+        if self.help_layer is None:
+            self.help_layer = self.build_help_layer()
+
+        x0 = Settings.screen_center[0] - 300
+        y0 = Settings.screen_center[1] - 200
+        surface.blit(self.help_layer, (x0, y0))
+
+    def draw_title(self, surface: Surface) -> None:
+        title_text = text_cache.render(
+            self.font_title,
             self.menu_title,
-            True,
             Colors.green_acidic,
         )
         title_rect = title_text.get_rect(center=(
             Settings.screen_center[0],
             120,
         ))
-        self.screen.blit(title_text, title_rect)
+        surface.blit(title_text, title_rect)
 
-    def draw_menu(self) -> None:
+    def draw_menu(self, surface: Surface) -> None:
         height: int = (
             self.menu_item_height * len(self.menu_items)
             + self.menu_items_gap * (len(self.menu_items)+1)
@@ -170,7 +200,7 @@ class BaseMenu(AppComponent):
             - height // 2
         )
         rect(
-            self.screen,
+            surface,
             Colors.blue_dark,
             Rect(x0, y0, width, height),
         )
@@ -192,23 +222,23 @@ class BaseMenu(AppComponent):
                 width-(self.menu_items_padding*2),
                 self.menu_item_height,
             )
-            text = self.font.render(
+            text = text_cache.render(
+                self.font,
                 self.menu_items[i].text,
-                True,
                 Colors.gray,
             )
             text_rect = text.get_rect(center=menu_item_rect.center)
             rect(
-                self.screen,
+                surface,
                 color,
                 menu_item_rect,
             )
-            self.screen.blit(text, text_rect)
+            surface.blit(text, text_rect)
 
-    def draw_help_text(self) -> None:
-        help_text = self.font_small.render(
+    def draw_help_text(self, surface: Surface) -> None:
+        help_text = text_cache.render(
+            self.font_small,
             'Press "UP" or "DOWN" to select, "ENTER" to activate',
-            True,
             Colors.gray,
         )
         help_rect = help_text.get_rect(
@@ -217,27 +247,55 @@ class BaseMenu(AppComponent):
                 Settings.screen_size_y-50,
             ),
         )
-        self.screen.blit(help_text, help_rect)
+        surface.blit(help_text, help_rect)
 
-    def draw(self) -> None:
-        self.screen.fill(Colors.blue_darker)
-        self.draw_title()
-        self.draw_menu()
-        self.draw_help_text()
+    def build_static_layer(self) -> Surface:
+        static_layer = self.screen.copy()
+        static_layer.fill(Colors.blue_darker)
+        self.draw_title(static_layer)
+        self.draw_help_text(static_layer)
+        return static_layer
+
+    def build_layer(self) -> None:
+        if (
+            self.static_layer is None
+            or self.static_layer_title != self.menu_title
+        ):
+            self.static_layer = self.build_static_layer()
+            self.static_layer_title = self.menu_title
+
+        if self.layer is None:
+            self.layer = self.screen.copy()
+
+        self.layer.blit(self.static_layer, (0, 0))
+        self.draw_menu(self.layer)
 
         if self.is_draw_stats:
-            self.draw_stats()
+            self.draw_stats(self.layer)
 
         if self.is_draw_help:
-            self.draw_help()
+            self.draw_help(self.layer)
+
+    def draw(self) -> None:
+        state = self.layer_state()
+        if self.layer is None or state != self.layer_drawn_state:
+            self.build_layer()
+            self.layer_drawn_state = state
+        elif Settings.use_dirty_rects and not self.is_invalidated:
+            self.dirty_rects = []
+            return
+
+        self.screen.blit(self.layer, (0, 0))
+        self.dirty_rects = None
+        self.is_invalidated = False
 
     def update(self, dt: float, time_now: float) -> None:
         self.time_now = time_now
 
 
 class MainMenu(BaseMenu):
-    def __init__(self, screen: Surface) -> None:
-        super().__init__(screen)
+    def __init__(self, screen: Surface, stats: UserStats) -> None:
+        super().__init__(screen, stats)
         self.menu_title = 'Space Miner'
         self.menu_items = (
             MenuItem('Start new game', self.go_to_game),
@@ -259,24 +317,30 @@ class MainMenu(BaseMenu):
 
 
 class PauseMenu(MainMenu):
-    def __init__(self, screen: Surface) -> None:
-        super().__init__(screen)
+    def __init__(self, screen: Surface, stats: UserStats) -> None:
+        super().__init__(screen, stats)
         self.menu_items[0].text = 'Resume your game'
         self.is_draw_stats = True
 
 
 class ShopMenu(BaseMenu):
-    def __init__(self, screen: Surface) -> None:
-        super().__init__(screen)
+    def __init__(
+        self,
+        screen: Surface,
+        stats: UserStats,
+        prices: Prices | None = None,
+    ) -> None:
+        super().__init__(screen, stats)
+        self.prices: Prices = prices if prices is not None else Prices()
         self.menu_title = 'Shop'
         self.menu_item_width = 500
         self.menu_items = (
             MenuItem(
-                f'Buy gun upgrade ({Prices.bullets} cr.)',
+                f'Buy gun upgrade ({self.prices.bullets} cr.)',
                 self.increase_max_bullets,
             ),
             MenuItem(
-                f'Buy additional live ({Prices.lives} cr.)',
+                f'Buy additional live ({self.prices.lives} cr.)',
                 self.increase_lives,
             ),
             MenuItem(
@@ -286,22 +350,23 @@ class ShopMenu(BaseMenu):
         )
         self.is_draw_stats = True
 
-    @staticmethod
-    def is_enough_credits(cost: int) -> bool:
-        return UserStats.credits - cost >= 0
+    def is_enough_credits(self, cost: int) -> bool:
+        return self.stats.credits - cost >= 0
 
     def increase_max_bullets(self) -> None:
-        if self.is_enough_credits(Prices.bullets):
-            UserStats.credits -= Prices.bullets
-            UserStats.max_bullets += 5
+        if self.is_enough_credits(self.prices.bullets):
+            self.stats.credits -= self.prices.bullets
+            self.stats.max_bullets += 5
+            self.event = AppEvents.save_progress
 
     def increase_lives(self) -> None:
-        if self.is_enough_credits(Prices.lives):
-            UserStats.credits -= Prices.lives
-            UserStats.lives += 1
+        if self.is_enough_credits(self.prices.lives):
+            self.stats.credits -= self.prices.lives
+            self.stats.lives += 1
+            self.event = AppEvents.save_progress
 
     def go_to_next_level(self) -> None:
-        UserStats.level += 1
+        self.stats.level += 1
         self.event = AppEvents.go_to_the_game
 
     def show_how_to_play(self) -> None:
@@ -0,0 +1,260 @@
+import csv
+from pathlib import Path
+from time import perf_counter
+
+import numpy as np
+from pygame import Rect, Surface
+from pygame.font import Font
+
+from components.fonts import fonts
+from components.game_objects.pool import ObjectPool
+from components.quality import QualityGovernor
+from components.text_cache import text_cache
+from settings import Colors, Settings
+
+PHASES: tuple[str, ...] = (
+    'input',
+    'spawn',
+    'ship',
+    'asteroids',
+    'grid',
+    'bullet_collisions',
+    'ship_collisions',
+    'cleanup',
+    'rewind',
+    'draw',
+    'flip',
+)
+
+
+class FrameProfiler:
+    """Per-phase frame timings kept in a fixed-size ring buffer.
+
+    `mark` starts timing, `lap` adds the time since the last mark to a
+    phase of the current frame and restarts timing, `end_frame` stores
+    the frame together with the object counts. While `is_enabled` is off
+    every call returns right away.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity: int = capacity
+        self.is_enabled: bool = False
+        self.phase_index: dict[str, int] = {
+            phase: i for i, phase in enumerate(PHASES)
+        }
+        self.timings = np.zeros((capacity, len(PHASES)))
+        self.counts = np.zeros((capacity, 2), dtype=np.int32)
+        self.frame = np.zeros(len(PHASES))
+        self.frames_recorded: int = 0
+        self.marked_at: float = 0.0
+
+    def __len__(self) -> int:
+        return min(self.frames_recorded, self.capacity)
+
+    def mark(self) -> None:
+        if self.is_enabled:
+            self.marked_at = perf_counter()
+
+    def lap(self, phase: str) -> None:
+        if not self.is_enabled:
+            return
+
+        now = perf_counter()
+        self.frame[self.phase_index[phase]] += now - self.marked_at
+        self.marked_at = now
+
+    def end_frame(self, asteroids: int, bullets: int) -> None:
+        if not self.is_enabled:
+            return
+
+        row = self.frames_recorded % self.capacity
+        self.timings[row] = self.frame
+        self.counts[row] = asteroids, bullets
+        self.frame[:] = 0
+        self.frames_recorded += 1
+
+    def ordered(self) -> tuple[np.ndarray, np.ndarray]:
+        """Return the recorded timings and counts, oldest frame first."""
+        size = len(self)
+        start = self.frames_recorded - size
+        order = (np.arange(size) + start) % self.capacity
+        return self.timings[order], self.counts[order]
+
+    def summary(self) -> dict[str, tuple[float, float, float]]:
+        """Return p50, p95 and max in milliseconds for every phase."""
+        timings, _ = self.ordered()
+        if not len(timings):
+            return {phase: (0.0, 0.0, 0.0) for phase in PHASES}
+
+        timings = timings * 1000
+        p50, p95 = np.percentile(timings, (50, 95), axis=0)
+        maximum = timings.max(axis=0)
+        return {
+            phase: (float(p50[i]), float(p95[i]), float(maximum[i]))
+            for i, phase in enumerate(PHASES)
+        }
+
+    def dump_csv(self, path: Path) -> None:
+        timings, counts = self.ordered()
+        with open(path, 'w', newline='', encoding='utf-8') as file:
+            writer = csv.writer(file)
+            writer.writerow(
+                [
+                    'frame',
+                    *(f'{phase}_ms' for phase in PHASES),
+                    'asteroids',
+                    'bullets',
+                ],
+            )
+            first = self.frames_recorded - len(timings)
+            for i, (row, frame_counts) in enumerate(zip(timings, counts)):
+                writer.writerow(
+                    [
+                        first + i,
+                        *(f'{value * 1000:.4f}' for value in row),
+                        *frame_counts,
+                    ],
+                )
+
+
+profiler = FrameProfiler(Settings.profiler_frames)
+
+
+class PopulationLog:
+    """Frame times grouped by asteroid population.
+
+    Populations are bucketed by `bucket_size`, so a soak run shows how
+    frame time degrades as the population grows.
+    """
+
+    def __init__(self, bucket_size: int) -> None:
+        self.bucket_size: int = bucket_size
+        self.frame_times: dict[int, list[float]] = {}
+
+    def record(self, frame_time: float, population: int) -> None:
+        bucket = population // self.bucket_size
+        self.frame_times.setdefault(bucket, []).append(frame_time)
+
+    def report(self) -> list[str]:
+        lines = []
+        for bucket, frame_times in sorted(self.frame_times.items()):
+            times = np.array(frame_times) * 1000
+            low = bucket * self.bucket_size
+            lines.append(
+                f'asteroids {low:>5}-{low + self.bucket_size - 1:<5} '
+                f'frames {len(times):>6}  '
+                f'mean {times.mean():7.2f} ms  '
+                f'p95 {np.percentile(times, 95):7.2f} ms  '
+                f'max {times.max():7.2f} ms',
+            )
+        return lines
+
+
+def stats_line(name: str, stats: dict[str, int]) -> str:
+    """One report line for the counters of a pool or cache."""
+    counters = ', '.join(
+        f'{key.replace("_", " ")} {value}' for key, value in stats.items()
+    )
+    return f'{name}: {counters}'
+
+
+def short_count(count: int) -> str:
+    """Count narrow enough for one overlay column."""
+    if count < 10_000:
+        return str(count)
+    if count < 10_000_000:
+        return f'{count // 1000}k'
+    return f'{count // 1_000_000}M'
+
+
+class ProfilerOverlay:
+    """Table of the profiler summary drawn in the top right corner.
+
+    The text is rebuilt every `refresh_frames` frames so it stays
+    readable and cheap to draw.
+    """
+
+    refresh_frames: int = 30
+    column_x: tuple[int, ...] = (10, 170, 230, 290)
+
+    def __init__(self, frame_profiler: FrameProfiler) -> None:
+        self.profiler: FrameProfiler = frame_profiler
+        self.is_visible: bool = False
+        self.quality: QualityGovernor | None = None
+        # Object pools by name, set once the game exists.
+        self.pools: dict[str, ObjectPool] = {}
+        self.surface: Surface | None = None
+        self.frames_until_refresh: int = 0
+
+    def toggle(self) -> None:
+        self.is_visible = not self.is_visible
+        self.surface = None
+        self.frames_until_refresh = 0
+
+    def render(self) -> Surface:
+        summary = self.profiler.summary()
+        _, counts = self.profiler.ordered()
+        asteroids, bullets = counts[-1] if len(counts) else (0, 0)
+        rows = [
+            ('phase', 'p50', 'p95', 'max'),
+            *(
+                (phase, *(f'{value:.2f}' for value in values))
+                for phase, values in summary.items()
+            ),
+            (f'asteroids: {asteroids}  bullets: {bullets}',),
+        ]
+        if self.quality is not None:
+            rows.append((f'quality: {self.quality.describe()}',))
+        if self.pools:
+            rows.append(('pool', 'hits', 'miss', 'high'))
+            for name, pool in self.pools.items():
+                stats = pool.stats()
+                rows.append(
+                    (
+                        name,
+                        short_count(stats['hits']),
+                        short_count(stats['misses']),
+                        short_count(stats['high_water']),
+                    ),
+                )
+        stats = text_cache.stats()
+        rows += [
+            ('cache', 'hits', 'miss', 'size'),
+            (
+                'text',
+                short_count(stats['hits']),
+                short_count(stats['misses']),
+                short_count(stats['size']),
+            ),
+        ]
+        font: Font = fonts.get('Courier New', 16)
+        line_height = font.get_linesize()
+        surface = Surface(
+            (self.column_x[-1] + 70, line_height * len(rows) + 20),
+        )
+        surface.fill(Colors.black)
+        for i, row in enumerate(rows):
+            for x, cell in zip(self.column_x, row):
+                text = font.render(cell, True, Colors.green_acidic)
+                surface.blit(text, (x, 10 + i * line_height))
+        return surface
+
+    def blit(self) -> tuple[Surface, Rect] | None:
+        if not self.is_visible:
+            return None
+
+        if self.surface is None or self.frames_until_refresh == 0:
+            self.surface = self.render()
+            self.frames_until_refresh = self.refresh_frames
+        self.frames_until_refresh -= 1
+
+        return (
+            self.surface,
+            self.surface.get_rect(topright=(Settings.screen_size_x - 10, 10)),
+        )
+
+    def draw(self, screen: Surface) -> Rect | None:
+        overlay = self.blit()
+        if overlay is None:
+            return None
+        return screen.blit(*overlay)
@@ -0,0 +1,120 @@
+from collections import deque
+from enum import IntEnum, auto
+from typing import Sequence
+
+
+class QualityLevel(IntEnum):
+    """Reductions in the order they are applied, each keeps the earlier."""
+
+    full = 0
+    circle_asteroids = auto()
+    slow_hud = auto()
+    coarse_collisions = auto()
+    skip_renders = auto()
+
+
+class QualityGovernor:
+    """Steps quality down while frames run over budget and back up after.
+
+    The mean work time of the last `window` frames is checked every
+    frame. Going over `budget` steps one level down. Stepping back up needs
+    the mean under `raise_share` of the budget for `hold_frames` frames in
+    a row. The window restarts after every change, so a level is judged
+    only by its own frames, and if a level has to be left again within
+    the hold, the hold doubles so the two levels do not flap.
+    """
+
+    window: int = 30
+    raise_share: float = 0.6
+    hold_frames: int = 120
+    max_hold_frames: int = 1800
+
+    def __init__(
+        self,
+        budget: float,
+        levels: Sequence[QualityLevel] = tuple(QualityLevel),
+        render_interval: int = 2,
+    ) -> None:
+        self.budget: float = budget
+        self.levels: tuple[QualityLevel, ...] = tuple(levels)
+        self.render_interval: int = render_interval
+        self.index: int = 0
+        self.frame_times: deque[float] = deque(maxlen=self.window)
+        self.frames_at_level: int = 0
+        self.frames_under: int = 0
+        self.hold: int = self.hold_frames
+        self.is_recovering: bool = False
+        self.frames_skipped: int = 0
+        self.level_frames: list[int] = [0] * len(self.levels)
+        self.changes: int = 0
+
+    @property
+    def level(self) -> QualityLevel:
+        return self.levels[self.index]
+
+    def is_active(self, level: QualityLevel) -> bool:
+        return level in self.levels[1:self.index + 1]
+
+    def should_skip_render(self) -> bool:
+        """True for all but one frame in `render_interval` when skipping."""
+        if not self.is_active(QualityLevel.skip_renders):
+            self.frames_skipped = 0
+            return False
+
+        if self.frames_skipped + 1 < self.render_interval:
+            self.frames_skipped += 1
+            return True
+        self.frames_skipped = 0
+        return False
+
+    def record(self, frame_time: float) -> None:
+        self.frame_times.append(frame_time)
+        self.frames_at_level += 1
+        self.level_frames[self.index] += 1
+        if len(self.frame_times) < self.window:
+            return
+
+        mean = sum(self.frame_times) / self.window
+        if mean > self.budget:
+            self.frames_under = 0
+            if self.index + 1 < len(self.levels):
+                self.step_down()
+        elif mean < self.budget * self.raise_share:
+            self.frames_under += 1
+            if self.index > 0 and self.frames_under >= self.hold:
+                self.step_up()
+        else:
+            self.frames_under = 0
+
+    def step_down(self) -> None:
+        if self.is_recovering and self.frames_at_level < self.hold:
+            # Raised too early, hold the next raise longer.
+            self.hold = min(self.hold * 2, self.max_hold_frames)
+        else:
+            self.hold = self.hold_frames
+        self.is_recovering = False
+        self.change(1)
+
+    def step_up(self) -> None:
+        self.is_recovering = True
+        self.change(-1)
+
+    def change(self, step: int) -> None:
+        self.index += step
+        self.frame_times.clear()
+        self.frames_at_level = 0
+        self.frames_under = 0
+        self.changes += 1
+
+    def describe(self) -> str:
+        return f'{self.index} {self.level.name}'
+
+    def report(self) -> list[str]:
+        total = sum(self.level_frames) or 1
+        lines = [f'Quality governor: {self.changes} level changes']
+        for level, frames in zip(self.levels, self.level_frames):
+            lines.append(
+                f'{level.name:<20} {frames:>7} frames '
+                f'{frames / total:>6.1%}',
+            )
+        return lines
@@ -0,0 +1,92 @@
+from threading import Condition, Thread
+from time import perf_counter
+from typing import Callable
+
+import pygame as pg
+from pygame import Surface
+
+from components.rendering import FrameSnapshot
+
+
+class RenderThread:
+    """Draws game frames on a separate thread while the next one simulates.
+
+    The simulation captures each frame into the back snapshot and hands it
+    over with `publish`; the thread swaps it with the front snapshot and
+    draws that one. A frame published before the thread got to the
+    previous one replaces it, so the simulation never waits for drawing.
+    Pygame releases the GIL while filling, blitting and flipping, which is
+    where the two threads overlap.
+    """
+
+    def __init__(self, screen: Surface, is_flipping: bool = True) -> None:
+        self.screen: Surface = screen
+        self.is_flipping: bool = is_flipping
+        self.front: FrameSnapshot = FrameSnapshot()
+        self.back: FrameSnapshot = FrameSnapshot()
+        self.condition: Condition = Condition()
+        self.is_ready: bool = False
+        self.is_drawing: bool = False
+        self.is_running: bool = True
+        self.frames_drawn: int = 0
+        self.frames_dropped: int = 0
+        self.draw_seconds: float = 0.0
+        self.thread: Thread = Thread(
+            target=self.run,
+            name='render',
+            daemon=True,
+        )
+        self.thread.start()
+
+    def publish(self, capture: Callable[[FrameSnapshot], None]) -> None:
+        """Capture the next frame into the back snapshot and queue it."""
+        with self.condition:
+            if self.is_ready:
+                self.frames_dropped += 1
+            self.back.clear()
+            capture(self.back)
+            self.is_ready = True
+            self.condition.notify_all()
+
+    def run(self) -> None:
+        while True:
+            with self.condition:
+                while not self.is_ready and self.is_running:
+                    self.condition.wait()
+                if not self.is_running:
+                    return
+                self.front, self.back = self.back, self.front
+                self.is_ready = False
+                self.is_drawing = True
+
+            started_at = perf_counter()
+            self.front.draw(self.screen)
+            if self.is_flipping:
+                pg.display.flip()
+
+            with self.condition:
+                self.draw_seconds += perf_counter() - started_at
+                self.frames_drawn += 1
+                self.is_drawing = False
+                self.condition.notify_all()
+
+    def wait_idle(self) -> None:
+        """Block until every published frame is drawn."""
+        with self.condition:
+            while self.is_ready or self.is_drawing:
+                self.condition.wait()
+
+    def stop(self) -> None:
+        self.wait_idle()
+        with self.condition:
+            self.is_running = False
+            self.condition.notify_all()
+        self.thread.join()
+
+    def report(self) -> str:
+        mean_ms = self.draw_seconds / max(self.frames_drawn, 1) * 1000
+        return (
+            f'Render thread: {self.frames_drawn} frames drawn, '
+            f'{self.frames_dropped} replaced before drawing, '
+            f'{mean_ms:.2f} ms per frame'
+        )
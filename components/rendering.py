@@ -0,0 +1,137 @@
+from enum import IntEnum, auto
+from typing import Iterable
+
+from pygame import Rect, Surface
+from pygame.draw import circle, polygon
+
+from components.game_objects.asteroid import Asteroid
+from components.game_objects.game_object import Circle, GameObject, Shape
+from settings import Colors
+
+
+class Layer(IntEnum):
+    background = 0
+    asteroids = auto()
+    ship = auto()
+    bullets = auto()
+    hud = auto()
+
+
+class SpriteBatch:
+    """Draw commands of one frame, submitted layer by layer.
+
+    Objects with a pre-rendered sprite are collected and blitted with a
+    single `Surface.blits` call per layer. Objects without one are drawn
+    with their own `draw` before the sprites of their layer.
+    """
+
+    def __init__(self) -> None:
+        self.blits: list[list[tuple[Surface, tuple[int, int]]]] = [
+            [] for _ in Layer
+        ]
+        self.sprite_owners: list[list[GameObject]] = [[] for _ in Layer]
+        self.drawn_owners: list[list[GameObject]] = [[] for _ in Layer]
+
+    def add(
+        self,
+        layer: Layer,
+        objects: Iterable[GameObject],
+        alpha: float,
+    ) -> None:
+        objects = list(objects)
+        sprites = [obj.sprite(alpha) for obj in objects]
+        if None not in sprites:
+            self.blits[layer].extend(sprites)
+            self.sprite_owners[layer].extend(objects)
+            return
+
+        for obj, sprite in zip(objects, sprites):
+            if sprite is None:
+                self.drawn_owners[layer].append(obj)
+            else:
+                self.blits[layer].append(sprite)
+                self.sprite_owners[layer].append(obj)
+
+    def submit(
+        self,
+        screen: Surface,
+        alpha: float,
+    ) -> list[tuple[GameObject, Rect]]:
+        """Draw every layer in order and return the rect of each object."""
+        drawn: list[tuple[GameObject, Rect]] = []
+        for layer in Layer:
+            for obj in self.drawn_owners[layer]:
+                drawn.append((obj, obj.draw(screen, alpha)))
+
+            blits = self.blits[layer]
+            if blits:
+                rects = screen.blits(blits)
+                drawn.extend(zip(self.sprite_owners[layer], rects))
+
+            blits.clear()
+            self.sprite_owners[layer].clear()
+            self.drawn_owners[layer].clear()
+        return drawn
+
+
+class FrameSnapshot:
+    """One game frame as plain draw commands, detached from the game.
+
+    Positions are interpolated while capturing, and sprites and HUD
+    surfaces are never changed once rendered, so the snapshot can be drawn
+    on another thread while the simulation keeps moving the objects.
+    """
+
+    def __init__(self) -> None:
+        self.circles: list[list[Circle]] = [[] for _ in Layer]
+        self.shapes: list[list[Shape]] = [[] for _ in Layer]
+        self.blits: list[list[tuple[Surface, tuple[int, int]]]] = [
+            [] for _ in Layer
+        ]
+        self.hud: list[tuple[Surface, Rect]] = []
+
+    def add(
+        self,
+        layer: Layer,
+        objects: Iterable[GameObject],
+        alpha: float,
+    ) -> None:
+        blits = self.blits[layer]
+        shapes = self.shapes[layer]
+        for obj in objects:
+            sprite = obj.sprite(alpha)
+            if sprite is not None:
+                blits.append(sprite)
+                continue
+
+            shape = obj.shape(alpha)
+            if shape is not None:
+                shapes.append(shape)
+
+    def add_circles(
+        self,
+        layer: Layer,
+        asteroids: Iterable[Asteroid],
+        alpha: float,
+    ) -> None:
+        self.circles[layer].extend(
+            asteroid.circle(alpha) for asteroid in asteroids
+        )
+
+    def clear(self) -> None:
+        for layer in Layer:
+            self.circles[layer].clear()
+            self.shapes[layer].clear()
+            self.blits[layer].clear()
+        self.hud.clear()
+
+    def draw(self, screen: Surface) -> None:
+        screen.fill(Colors.blue_darker)
+        for layer in Layer:
+            for color, center, radius, width in self.circles[layer]:
+                circle(screen, color, center, radius, width)
+            for color, points, width in self.shapes[layer]:
+                polygon(screen, color, points, width)
+            if self.blits[layer]:
+                screen.blits(self.blits[layer], doreturn=False)
+        screen.blits(self.hud, doreturn=False)
@@ -0,0 +1,427 @@
+import sys
+from collections import deque
+from math import ceil
+from struct import Struct
+from time import perf_counter
+from typing import TYPE_CHECKING, NamedTuple
+
+import numpy as np
+from pygame.math import Vector2
+
+if TYPE_CHECKING:
+    from components.game import Game
+    from components.game_objects.asteroid import Asteroid
+
+# Full asteroid record, in keyframes and for asteroids spawned since.
+ASTEROID = np.dtype(
+    [
+        ('serial', '<u4'),
+        ('x', '<f4'),
+        ('y', '<f4'),
+        ('angle', '<f4'),
+        ('vx', '<f4'),
+        ('vy', '<f4'),
+        ('rotation_speed', '<f4'),
+        ('size', 'u1'),
+        ('shape_id', '<u2'),
+    ],
+)
+# Bullet position and velocity.
+BULLET = np.dtype('<f4')
+BULLET_FIELDS: int = 4
+# Asteroid and bullet counts of a frame.
+COUNTS = Struct('<II')
+# Ship position, velocity and angle, ages of the shot, reload and ship
+# spawn timers, then bullets left, reloading, `UserStats`, current level
+# and asteroid amount.
+SCALARS = Struct('<8d8i')
+HEADER_SIZE: int = COUNTS.size + SCALARS.size
+
+# Fixed point steps of the delta frames.
+POSITION_STEPS: int = 16  # per pixel
+ANGLE_STEPS: int = 100  # per degree
+DELTA_LIMIT: int = np.iinfo(np.int16).max
+
+
+class RewindFrame(NamedTuple):
+    scalars: tuple[float | int, ...]
+    asteroids: np.ndarray
+    bullets: np.ndarray
+
+
+class RewindGroup:
+    """A keyframe and the delta frames encoded against it."""
+
+    def __init__(self, keyframe: bytes) -> None:
+        self.keyframe: bytes = keyframe
+        asteroid_count, _ = COUNTS.unpack_from(keyframe)
+        self.rows: np.ndarray = np.frombuffer(
+            keyframe,
+            ASTEROID,
+            asteroid_count,
+            HEADER_SIZE,
+        )
+        self.deltas: list[bytes] = []
+
+    def __len__(self) -> int:
+        return 1 + len(self.deltas)
+
+    def nbytes(self) -> int:
+        return sys.getsizeof(self.keyframe) + sum(
+            sys.getsizeof(delta) for delta in self.deltas
+        )
+
+
+def unpack_frame(
+    data: bytes,
+) -> tuple[tuple[float | int, ...], int, np.ndarray]:
+    """Return the scalars, asteroid count and bullets of a frame."""
+    asteroid_count, bullet_count = COUNTS.unpack_from(data)
+    scalars = SCALARS.unpack_from(data, COUNTS.size)
+    bullets = np.frombuffer(
+        data,
+        BULLET,
+        bullet_count * BULLET_FIELDS,
+        len(data) - bullet_count * BULLET_FIELDS * BULLET.itemsize,
+    ).reshape(bullet_count, BULLET_FIELDS)
+    return scalars, asteroid_count, bullets
+
+
+class RewindBuffer:
+    """The last `seconds` of game state, to scrub back through.
+
+    Every tick is packed into one bytes object. Every `keyframe_interval`
+    ticks a keyframe holds full records of the ship, bullets, asteroids and
+    `UserStats`. The ticks in between store the same ship, bullet and
+    stats fields, but for asteroids only which keyframe asteroids are
+    still alive, their position and angle as 16-bit fixed point deltas
+    against the keyframe, and full records of asteroids spawned since.
+    Asteroids are matched by their spawn serial and refer to their outline
+    in the shape library. Whole keyframe groups are dropped once they fall
+    out of the window.
+    """
+
+    def __init__(
+        self,
+        seconds: float,
+        tick_rate: int,
+        keyframe_interval: int,
+    ) -> None:
+        self.tick_rate: int = tick_rate
+        self.keyframe_interval: int = keyframe_interval
+        self.max_groups: int = ceil(seconds * tick_rate / keyframe_interval)
+        self.groups: deque[RewindGroup] = deque()
+
+        self.captures: int = 0
+        self.capture_seconds: float = 0.0
+
+    def __len__(self) -> int:
+        return sum(len(group) for group in self.groups)
+
+    def clear(self) -> None:
+        self.groups.clear()
+
+    @staticmethod
+    def asteroid_rows(
+        asteroids: 'list[Asteroid]',
+        serials: np.ndarray,
+        motion: np.ndarray,
+    ) -> np.ndarray:
+        rows = np.empty(len(asteroids), ASTEROID)
+        rows['serial'] = serials
+        rows['x'] = motion[:, 0]
+        rows['y'] = motion[:, 1]
+        rows['angle'] = motion[:, 2]
+        constants = []
+        for asteroid in asteroids:
+            velocity = asteroid.velocity
+            constants.append(
+                (
+                    velocity.x,
+                    velocity.y,
+                    asteroid.rotation_speed,
+                    asteroid.size,
+                    asteroid.shape_id,
+                ),
+            )
+        if constants:
+            vx, vy, rotation_speed, size, shape_id = zip(*constants)
+            rows['vx'] = vx
+            rows['vy'] = vy
+            rows['rotation_speed'] = rotation_speed
+            rows['size'] = size
+            rows['shape_id'] = shape_id
+        return rows
+
+    @staticmethod
+    def capture_scalars(game: 'Game') -> bytes:
+        ship = game.ship
+        stats = game.stats
+        return SCALARS.pack(
+            ship.position.x,
+            ship.position.y,
+            ship.velocity.x,
+            ship.velocity.y,
+            ship.angle,
+            game.time_now - ship.last_shot_time,
+            game.time_now - ship.last_reload_time,
+            game.time_now - game.ship_spawned_at,
+            ship.cur_bullets,
+            ship.is_reloading,
+            stats.level,
+            stats.credits,
+            stats.lives,
+            stats.max_bullets,
+            game.current_level,
+            game.asteroids_amount,
+        )
+
+    @staticmethod
+    def capture_bullets(game: 'Game') -> np.ndarray:
+        values: list[float] = []
+        for bullet in game.ship.bullets:
+            position = bullet.position
+            velocity = bullet.velocity
+            values += (position.x, position.y, velocity.x, velocity.y)
+        return np.array(values, BULLET)
+
+    def record(self, game: 'Game') -> None:
+        """Append the state at the end of the tick that just ran."""
+        started_at = perf_counter()
+        asteroids = game.asteroids.items
+        count = len(asteroids)
+        serials = np.fromiter(
+            (asteroid.serial for asteroid in asteroids),
+            np.uint32,
+            count,
+        )
+        values: list[float] = []
+        for asteroid in asteroids:
+            position = asteroid.position
+            values += (position.x, position.y, asteroid.angle)
+        motion = np.array(values, np.float32).reshape(count, 3)
+        scalars = self.capture_scalars(game)
+        bullets = self.capture_bullets(game)
+        bullet_count = len(bullets) // BULLET_FIELDS
+
+        group = self.groups[-1] if self.groups else None
+        delta = None
+        if group is not None and len(group) < self.keyframe_interval:
+            delta = self.encode_delta(
+                group,
+                asteroids,
+                serials,
+                motion,
+                scalars,
+                bullets,
+            )
+
+        if delta is not None:
+            group.deltas.append(delta)
+        else:
+            rows = self.asteroid_rows(asteroids, serials, motion)
+            self.add_group(
+                b''.join(
+                    (
+                        COUNTS.pack(count, bullet_count),
+                        scalars,
+                        rows.tobytes(),
+                        bullets.tobytes(),
+                    ),
+                ),
+            )
+
+        self.captures += 1
+        self.capture_seconds += perf_counter() - started_at
+
+    def add_group(self, keyframe: bytes) -> None:
+        if len(self.groups) == self.max_groups:
+            self.groups.popleft()
+        self.groups.append(RewindGroup(keyframe))
+
+    def encode_delta(
+        self,
+        group: RewindGroup,
+        asteroids: 'list[Asteroid]',
+        serials: np.ndarray,
+        motion: np.ndarray,
+        scalars: bytes,
+        bullets: np.ndarray,
+    ) -> bytes | None:
+        """Encode against the group keyframe, None if it cannot be."""
+        if len(serials) > 1 and not np.all(serials[1:] > serials[:-1]):
+            return None
+
+        # Survivors keep their order and spawns are appended, so the
+        # keyframe asteroids still alive come first.
+        key_rows = group.rows
+        survivors = (
+            int(np.searchsorted(serials, key_rows['serial'][-1], 'right'))
+            if len(key_rows)
+            else 0
+        )
+        indices = np.searchsorted(key_rows['serial'], serials[:survivors])
+        if survivors and not np.array_equal(
+            key_rows['serial'][indices],
+            serials[:survivors],
+        ):
+            return None
+
+        key_motion = np.empty((survivors, 3), np.float32)
+        key_motion[:, 0] = key_rows['x'][indices]
+        key_motion[:, 1] = key_rows['y'][indices]
+        key_motion[:, 2] = key_rows['angle'][indices]
+        deltas = np.rint(
+            (motion[:survivors] - key_motion)
+            * np.array([POSITION_STEPS, POSITION_STEPS, ANGLE_STEPS]),
+        )
+        if survivors and np.abs(deltas).max() > DELTA_LIMIT:
+            return None
+
+        alive = np.zeros(len(key_rows), bool)
+        alive[indices] = True
+        rows = self.asteroid_rows(
+            asteroids[survivors:],
+            serials[survivors:],
+            motion[survivors:],
+        )
+        return b''.join(
+            (
+                COUNTS.pack(len(serials), len(bullets) // BULLET_FIELDS),
+                scalars,
+                np.packbits(alive).tobytes(),
+                deltas.astype('<i2').tobytes(),
+                rows.tobytes(),
+                bullets.tobytes(),
+            ),
+        )
+
+    def decode(self, group: RewindGroup, data: bytes) -> RewindFrame:
+        key_rows = group.rows
+        scalars, count, bullets = unpack_frame(data)
+        if data is group.keyframe:
+            return RewindFrame(scalars, key_rows, bullets)
+
+        offset = HEADER_SIZE
+        alive_bytes = (len(key_rows) + 7) // 8
+        alive = np.unpackbits(
+            np.frombuffer(data, np.uint8, alive_bytes, offset),
+            count=len(key_rows),
+        ).astype(bool)
+        offset += alive_bytes
+
+        survivors = int(alive.sum())
+        deltas = np.frombuffer(data, '<i2', survivors * 3, offset)
+        deltas = deltas.reshape(survivors, 3)
+        offset += deltas.nbytes
+
+        rows = np.empty(count, ASTEROID)
+        rows[:survivors] = key_rows[alive]
+        rows['x'][:survivors] += deltas[:, 0] / POSITION_STEPS
+        rows['y'][:survivors] += deltas[:, 1] / POSITION_STEPS
+        rows['angle'][:survivors] += deltas[:, 2] / ANGLE_STEPS
+        rows[survivors:] = np.frombuffer(
+            data,
+            ASTEROID,
+            count - survivors,
+            offset,
+        )
+        return RewindFrame(scalars, rows, bullets)
+
+    def step_back(self, game: 'Game') -> bool:
+        """Drop the newest tick and restore the one before it."""
+        if not self.groups or len(self) == 1:
+            return False
+
+        group = self.groups[-1]
+        if group.deltas:
+            group.deltas.pop()
+        else:
+            self.groups.pop()
+            group = self.groups[-1]
+
+        data = group.deltas[-1] if group.deltas else group.keyframe
+        self.restore(game, self.decode(group, data))
+        return True
+
+    def restore(self, game: 'Game', frame: RewindFrame) -> None:
+        time_now = game.time_now
+        (
+            x,
+            y,
+            velocity_x,
+            velocity_y,
+            angle,
+            shot_age,
+            reload_age,
+            spawn_age,
+            cur_bullets,
+            is_reloading,
+            level,
+            credits,
+            lives,
+            max_bullets,
+            current_level,
+            asteroids_amount,
+        ) = frame.scalars
+
+        ship = game.ship
+        ship.position = Vector2(x, y)
+        ship.previous_position = Vector2(x, y)
+        ship.velocity = Vector2(velocity_x, velocity_y)
+        ship.angle = angle
+        ship.previous_angle = angle
+        ship.last_shot_time = time_now - shot_age
+        ship.last_reload_time = time_now - reload_age
+        ship.cur_bullets = cur_bullets
+        ship.is_reloading = bool(is_reloading)
+        game.ship_spawned_at = time_now - spawn_age
+
+        stats = game.stats
+        stats.level = level
+        stats.credits = credits
+        stats.lives = lives
+        stats.max_bullets = max_bullets
+        game.current_level = current_level
+        game.asteroids_amount = asteroids_amount
+
+        ship.bullets.clear()
+        for x, y, velocity_x, velocity_y in frame.bullets.tolist():
+            velocity = Vector2(velocity_x, velocity_y)
+            ship.bullets.spawn(game.bullet_pool.acquire(x, y, velocity))
+        ship.bullets.apply()
+
+        live = {asteroid.serial: asteroid for asteroid in game.asteroids}
+        restored = []
+        for serial, x, y, angle, *constants in frame.asteroids.tolist():
+            asteroid = live.get(serial)
+            if asteroid is None:
+                velocity_x, velocity_y, rotation_speed, size, shape_id = (
+                    constants
+                )
+                asteroid = game.asteroid_pool.acquire(x, y, size)
+                asteroid.serial = serial
+                asteroid.velocity = Vector2(velocity_x, velocity_y)
+                asteroid.rotation_speed = rotation_speed
+                asteroid.set_shape(shape_id)
+            asteroid.position = Vector2(x, y)
+            asteroid.previous_position = Vector2(x, y)
+            asteroid.angle = angle
+            asteroid.previous_angle = angle
+            asteroid.alive = True
+            restored.append(asteroid)
+        game.asteroids.replace(restored)
+
+    def nbytes(self) -> int:
+        return sum(group.nbytes() for group in self.groups)
+
+    def report(self) -> str:
+        seconds = len(self) / self.tick_rate
+        nbytes = self.nbytes()
+        per_second = nbytes / seconds if seconds else 0.0
+        capture_us = self.capture_seconds / max(self.captures, 1) * 1e6
+        return (
+            f'Rewind: {seconds:.1f} s of history in {nbytes / 1024:.1f} KiB, '
+            f'{per_second / 1024:.2f} KiB per second, '
+            f'{capture_us:.0f} us per capture'
+        )
@@ -0,0 +1,114 @@
+import os
+from pathlib import Path
+from struct import Struct
+from threading import Condition, Thread
+from time import monotonic
+
+from settings import UserStats
+
+SAVE_MAGIC: bytes = b'SMSV'
+SAVE_VERSION: int = 1
+
+# Magic, version, then level, credits, lives and max bullets.
+PROFILE = Struct('<4sBiiii')
+
+
+def encode_profile(stats: UserStats) -> bytes:
+    return PROFILE.pack(
+        SAVE_MAGIC,
+        SAVE_VERSION,
+        stats.level,
+        stats.credits,
+        stats.lives,
+        stats.max_bullets,
+    )
+
+
+def decode_profile(data: bytes) -> UserStats:
+    if len(data) != PROFILE.size:
+        raise ValueError(f'Profile has {len(data)} bytes, not {PROFILE.size}')
+
+    magic, version, level, credits, lives, max_bullets = PROFILE.unpack(data)
+    if magic != SAVE_MAGIC or version != SAVE_VERSION:
+        raise ValueError(f'Not a version {SAVE_VERSION} profile')
+    return UserStats(level, credits, lives, max_bullets)
+
+
+def load_profile(path: Path) -> UserStats | None:
+    """Return the saved profile, None if it is missing or unreadable."""
+    try:
+        return decode_profile(path.read_bytes())
+    except (OSError, ValueError):
+        return None
+
+
+def write_atomically(path: Path, data: bytes) -> None:
+    """Replace `path` so readers see either the old or the new file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_name(f'{path.name}.tmp')
+    with open(temp_path, 'wb') as file:
+        file.write(data)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temp_path, path)
+
+
+class SaveWriter:
+    """Writes the profile on a background thread, off the frame loop.
+
+    `save` only encodes the stats and hands the bytes over. The thread
+    waits `delay` seconds after the first request before writing, and
+    only the newest request is written, so a burst of purchases ends up
+    as a single write.
+    """
+
+    def __init__(self, path: Path, delay: float) -> None:
+        self.path: Path = path
+        self.delay: float = delay
+        self.condition: Condition = Condition()
+        self.pending: bytes | None = None
+        self.requested_at: float = 0.0
+        self.is_running: bool = True
+        self.writes: int = 0
+        self.thread: Thread = Thread(
+            target=self.run,
+            name='save-writer',
+            daemon=True,
+        )
+        self.thread.start()
+
+    def save(self, stats: UserStats) -> None:
+        data = encode_profile(stats)
+        with self.condition:
+            if self.pending is None:
+                self.requested_at = monotonic()
+            self.pending = data
+            self.condition.notify_all()
+
+    def run(self) -> None:
+        while True:
+            with self.condition:
+                while self.pending is None and self.is_running:
+                    self.condition.wait()
+                if self.pending is None:
+                    return
+
+                # Let further requests coalesce, unless shutting down.
+                write_at = self.requested_at + self.delay
+                while self.is_running and monotonic() < write_at:
+                    self.condition.wait(write_at - monotonic())
+                data = self.pending
+                self.pending = None
+
+            try:
+                write_atomically(self.path, data)
+                self.writes += 1
+            except OSError as error:
+                print(f'Could not save the profile to {self.path}: {error}')
+
+    def close(self) -> None:
+        """Write any pending save and stop the thread."""
+        with self.condition:
+            self.is_running = False
+            self.condition.notify_all()
+        self.thread.join()
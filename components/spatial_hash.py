@@ -0,0 +1,87 @@
+from math import ceil, floor
+from typing import Iterable, Iterator
+
+from pygame.math import Vector2
+
+from components.game_objects.game_object import GameObject
+from settings import Settings
+
+
+class SpatialHash:
+    """Uniform grid over the screen used as a collision broad phase.
+
+    Cell coordinates wrap around the screen edges the same way
+    objects do in `GameObject.update`, so an object sitting on an edge
+    (including exactly on `screen_size`) always lands in valid cells.
+    Objects keep their insertion index, and queries return them in that
+    order, so callers see candidates in the same order as the list the
+    grid was built from.
+    """
+
+    def __init__(self, cell_size: int) -> None:
+        self.cell_size: int = cell_size
+        self.columns: int = ceil(Settings.screen_size_x / cell_size)
+        self.rows: int = ceil(Settings.screen_size_y / cell_size)
+        self.cells: dict[int, list[int]] = {}
+        self.objects: list[GameObject] = []
+
+    def clear(self) -> None:
+        self.cells.clear()
+        self.objects.clear()
+
+    def rebuild(self, objects: Iterable[GameObject]) -> None:
+        self.clear()
+        for obj in objects:
+            self.insert(obj)
+
+    def cells_for(self, position: Vector2, radius: float) -> Iterator[int]:
+        col_first = floor((position.x - radius) / self.cell_size)
+        col_last = floor((position.x + radius) / self.cell_size)
+        row_first = floor((position.y - radius) / self.cell_size)
+        row_last = floor((position.y + radius) / self.cell_size)
+
+        col_last = min(col_last, col_first + self.columns - 1)
+        row_last = min(row_last, row_first + self.rows - 1)
+
+        for row in range(row_first, row_last + 1):
+            row_key = (row % self.rows) * self.columns
+            for col in range(col_first, col_last + 1):
+                yield row_key + col % self.columns
+
+    def insert(self, obj: GameObject) -> None:
+        index = len(self.objects)
+        self.objects.append(obj)
+
+        # `cells_for` inlined, this runs for every asteroid every tick.
+        cells = self.cells
+        cell_size = self.cell_size
+        columns = self.columns
+        rows = self.rows
+        x = obj.position.x
+        y = obj.position.y
+        radius = obj.radius
+        col_first = floor((x - radius) / cell_size)
+        col_last = floor((x + radius) / cell_size)
+        row_first = floor((y - radius) / cell_size)
+        row_last = floor((y + radius) / cell_size)
+
+        col_last = min(col_last, col_first + columns - 1)
+        row_last = min(row_last, row_first + rows - 1)
+
+        for row in range(row_first, row_last + 1):
+            row_key = (row % rows) * columns
+            for col in range(col_first, col_last + 1):
+                key = row_key + col % columns
+                cell = cells.get(key)
+                if cell is None:
+                    cells[key] = [index]
+                else:
+                    cell.append(index)
+
+    def query(self, position: Vector2, radius: float) -> list[GameObject]:
+        found: set[int] = set()
+        for key in self.cells_for(position, radius):
+            cell = self.cells.get(key)
+            if cell:
+                found.update(cell)
+        return [self.objects[index] for index in sorted(found)]
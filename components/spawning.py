@@ -0,0 +1,59 @@
+from math import ceil, sqrt
+from random import Random
+
+from pygame.math import Vector2
+
+from settings import Settings
+
+
+class StratifiedSampler:
+    """Spawn positions spread evenly over the screen.
+
+    The screen is split into about `cells` equal cells that are visited in
+    a shuffled order, one jittered point per cell. Consecutive batches
+    therefore cover the screen evenly instead of clumping like independent
+    uniform draws. A point inside the excluded circle is dropped and the
+    next cell is tried, so a batch never loops on rejections.
+    """
+
+    def __init__(self, rng: Random, cells: int) -> None:
+        self.rng: Random = rng
+        cell_size = sqrt(
+            Settings.screen_size_x * Settings.screen_size_y / max(cells, 1),
+        )
+        self.columns: int = max(1, ceil(Settings.screen_size_x / cell_size))
+        self.rows: int = max(1, ceil(Settings.screen_size_y / cell_size))
+        self.cell_width: float = Settings.screen_size_x / self.columns
+        self.cell_height: float = Settings.screen_size_y / self.rows
+        self.order: list[int] = []
+
+    def next_cell(self) -> int:
+        if not self.order:
+            self.order = list(range(self.columns * self.rows))
+            self.rng.shuffle(self.order)
+        return self.order.pop()
+
+    def sample(
+        self,
+        count: int,
+        exclude_center: Vector2,
+        exclude_radius: float,
+    ) -> list[tuple[float, float]]:
+        """Return up to `count` points outside the excluded circle."""
+        center_x, center_y = exclude_center.x, exclude_center.y
+        exclude_radius_squared = exclude_radius * exclude_radius
+        cell_count = self.columns * self.rows
+
+        points: list[tuple[float, float]] = []
+        for _ in range(count + cell_count):
+            if len(points) == count:
+                break
+
+            row, column = divmod(self.next_cell(), self.columns)
+            x = (column + self.rng.random()) * self.cell_width
+            y = (row + self.rng.random()) * self.cell_height
+            dx = x - center_x
+            dy = y - center_y
+            if dx * dx + dy * dy > exclude_radius_squared:
+                points.append((x, y))
+        return points
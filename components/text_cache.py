@@ -0,0 +1,81 @@
+from collections import OrderedDict
+from typing import Callable, Hashable
+
+from pygame import Surface
+from pygame.font import Font
+
+from settings import Settings
+
+
+class TextCache:
+    """LRU cache of rendered text surfaces.
+
+    Keyed on (font, text, color, antialias). `misses` is the number of
+    times a font was actually rasterized.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size: int = max_size
+        self.surfaces: OrderedDict[tuple, Surface] = OrderedDict()
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def render(
+        self,
+        font: Font,
+        text: str,
+        color: tuple[int, int, int],
+        antialias: bool = True,
+    ) -> Surface:
+        key = (font, text, color, antialias)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+
+        surface = font.render(text, antialias, color)
+        self.surfaces[key] = surface
+        self.misses += 1
+        if len(self.surfaces) > self.max_size:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def clear(self) -> None:
+        self.surfaces.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': len(self.surfaces),
+        }
+
+
+text_cache = TextCache(Settings.text_cache_size)
+
+
+class HudLabel:
+    """Text label that is re-rendered only when its value changes."""
+
+    def __init__(
+        self,
+        font: Font,
+        color: tuple[int, int, int],
+        text: Callable[..., str],
+    ) -> None:
+        self.font: Font = font
+        self.color: tuple[int, int, int] = color
+        self.text: Callable[..., str] = text
+        self.value: Hashable = None
+        self.surface: Surface | None = None
+
+    def render(self, *value: Hashable) -> Surface:
+        if self.surface is None or value != self.value:
+            self.value = value
+            self.surface = text_cache.render(
+                self.font,
+                self.text(*value),
+                self.color,
+            )
+        return self.surface
@@ -0,0 +1,259 @@
+import os
+from argparse import ArgumentParser
+from pathlib import Path
+from random import Random
+from time import perf_counter
+
+import pygame as pg
+from pygame import Surface
+
+from components.game import Game
+from components.input_log import (
+    RECORD_CHECKSUM,
+    RECORD_DT,
+    RECORD_RESUME,
+    RECORD_TICK,
+    InputLog,
+    decode_keys,
+    state_checksum,
+)
+from components.inputs import AutoPilot, InputScript, InputSource, KeyState
+from components.memory import memory_report
+from components.profiler import PopulationLog, stats_line
+from components.render_thread import RenderThread
+from components.text_cache import text_cache
+from settings import AppEvents, Settings
+
+
+class HeadlessRunner:
+    """Runs `Game` without a window on a fixed `dt` and synthetic clock.
+
+    Shop visits skip straight to the next level, pause requests are
+    ignored and a game over simply restarts, so a run never waits for a
+    human.
+    """
+
+    def __init__(
+        self,
+        seed: int,
+        dt: float,
+        input_source: InputSource | None = None,
+        is_drawing: bool = True,
+    ) -> None:
+        self.dt: float = dt
+        self.is_drawing: bool = is_drawing
+        self.population_log: PopulationLog | None = None
+        self.frame: int = 0
+        self.keys: KeyState = KeyState()
+
+        self.game: Game = Game(Surface(Settings.screen_size), Random(seed))
+        self.game.get_pressed = lambda: self.keys
+        self.render_thread: RenderThread | None = (
+            RenderThread(self.game.screen, is_flipping=False)
+            if is_drawing and Settings.use_render_thread
+            else None
+        )
+        self.input_source: InputSource = (
+            input_source if input_source is not None else AutoPilot(self.game)
+        )
+
+    def step(self) -> None:
+        self.keys, pressed = self.input_source.next_frame(self.frame)
+        self.frame += 1
+
+        self.game.handle_input(pressed)
+        self.game.update(self.dt, self.frame * self.dt)
+        if self.is_drawing:
+            self.draw()
+
+        event = self.game.event
+        self.game.event = AppEvents.no_event
+        if event is AppEvents.go_to_shop_menu:
+            self.visit_shop()
+
+    def draw(self) -> None:
+        if self.render_thread is not None:
+            self.render_thread.publish(self.game.capture)
+        else:
+            self.game.draw()
+
+    def visit_shop(self) -> None:
+        self.game.stats.level += 1
+
+    def run(self, frames: int) -> float:
+        started_at = perf_counter()
+        for _ in range(frames):
+            if self.population_log is None:
+                self.step()
+                continue
+
+            step_started_at = perf_counter()
+            self.step()
+            self.population_log.record(
+                perf_counter() - step_started_at,
+                len(self.game.asteroids),
+            )
+        if self.render_thread is not None:
+            self.render_thread.wait_idle()
+        return perf_counter() - started_at
+
+
+class ReplayRunner(HeadlessRunner):
+    """Feeds a recorded input log back into `Game` as fast as possible.
+
+    Unlike `HeadlessRunner` the game clock and `UserStats` come from the
+    log, so menu visits of the recorded session are reproduced exactly.
+    Checksums in the log are compared against the replayed state and the
+    first mismatch is kept in `diverged_at`.
+    """
+
+    def __init__(self, log: InputLog, is_drawing: bool = True) -> None:
+        self.records = log.records()
+        self.time_now: float = 0.0
+        self.is_finished: bool = False
+        self.diverged_at: int | None = None
+        super().__init__(
+            log.seed,
+            1 / Settings.tick_rate,
+            InputScript(()),
+            is_drawing,
+        )
+        if log.stress_population:
+            self.game.enable_stress_mode(log.stress_population)
+
+    def resume(
+        self,
+        time_now: float,
+        level: int,
+        credits: int,
+        lives: int,
+        max_bullets: int,
+    ) -> None:
+        self.time_now = time_now
+        self.game.stats.level = level
+        self.game.stats.credits = credits
+        self.game.stats.lives = lives
+        self.game.stats.max_bullets = max_bullets
+
+    def step(self) -> None:
+        for kind, values in self.records:
+            if kind == RECORD_TICK:
+                held, pressed = values
+                self.keys = KeyState(decode_keys(held))
+                self.frame += 1
+                self.time_now += self.dt
+
+                self.game.handle_input(decode_keys(pressed))
+                self.game.update(self.dt, self.time_now)
+                if self.is_drawing:
+                    self.draw()
+                self.game.event = AppEvents.no_event
+                return
+
+            if kind == RECORD_DT:
+                (self.dt,) = values
+            elif kind == RECORD_RESUME:
+                self.resume(*values)
+            elif kind == RECORD_CHECKSUM:
+                if (
+                    self.diverged_at is None
+                    and values[0] != state_checksum(self.game)
+                ):
+                    self.diverged_at = self.frame
+
+        self.is_finished = True
+
+    def run_to_end(self) -> float:
+        started_at = perf_counter()
+        while not self.is_finished:
+            self.step()
+        if self.render_thread is not None:
+            self.render_thread.wait_idle()
+        return perf_counter() - started_at
+
+
+def main() -> None:
+    parser = ArgumentParser(description='Run Space Miner without a window.')
+    parser.add_argument('--frames', type=int, default=3600)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--dt', type=float, default=1 / 60)
+    parser.add_argument(
+        '--script',
+        type=Path,
+        help='input script, the built-in autopilot flies when omitted',
+    )
+    parser.add_argument(
+        '--replay',
+        type=Path,
+        help='input log recorded with space_miner.py --record, '
+        'replayed to its end instead of running --frames',
+    )
+    parser.add_argument(
+        '--stress',
+        type=int,
+        metavar='POPULATION',
+        help='endless mode keeping this many asteroids alive',
+    )
+    parser.add_argument('--no-draw', action='store_true')
+    parser.add_argument(
+        '--memory',
+        action='store_true',
+        help='print the memory used per entity type at the end',
+    )
+    args = parser.parse_args()
+
+    os.environ['SDL_VIDEODRIVER'] = 'dummy'
+    pg.init()
+
+    diverged_at: int | None = None
+    if args.replay is not None:
+        replay = ReplayRunner(
+            InputLog.load(args.replay),
+            is_drawing=not args.no_draw,
+        )
+        elapsed = replay.run_to_end()
+        diverged_at = replay.diverged_at
+        runner: HeadlessRunner = replay
+    else:
+        runner = HeadlessRunner(
+            args.seed,
+            args.dt,
+            is_drawing=not args.no_draw,
+        )
+        if args.script is not None:
+            runner.input_source = InputScript.from_file(args.script)
+        if args.stress:
+            runner.game.enable_stress_mode(args.stress)
+            runner.population_log = PopulationLog(Settings.stress_log_bucket)
+        elapsed = runner.run(args.frames)
+
+    print(f'frames: {runner.frame}')
+    print(f'fps: {runner.frame / elapsed:.1f}')
+    stats = runner.game.stats
+    print(
+        f'level: {stats.level}, credits: {stats.credits}, '
+        f'lives: {stats.lives}, max bullets: {stats.max_bullets}',
+    )
+    print(f'checksum: {state_checksum(runner.game):08x}')
+    if diverged_at is not None:
+        print(f'replay diverged at frame {diverged_at}')
+    if runner.population_log is not None:
+        print('\n'.join(runner.population_log.report()))
+    if args.memory:
+        print('\n'.join(memory_report(runner.game)))
+    print(stats_line('Asteroid pool', runner.game.asteroid_pool.stats()))
+    print(stats_line('Bullet pool', runner.game.bullet_pool.stats()))
+    print(stats_line('Text cache', text_cache.stats()))
+    if runner.game.rewind is not None:
+        print(runner.game.rewind.report())
+    if runner.render_thread is not None:
+        runner.render_thread.stop()
+        print(runner.render_thread.report())
+
+    pg.quit()
+    if diverged_at is not None:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -10,6 +10,7 @@ class AppEvents(Enum):
     go_to_pause_menu = auto()
     go_to_shop_menu = auto()
     quit_the_game = auto()
+    save_progress = auto()
 
 
 @dataclass
@@ -19,7 +20,43 @@ class Settings:
     screen_size: tuple[int, int] = screen_size_x, screen_size_y
     screen_center: tuple[int, int] = screen_size_x // 2, screen_size_y // 2
     asteroids_start_amount: int = 2
+    asteroids_per_level: int = 2
     safe_distance: int = 100
+    use_spatial_hash: bool = True
+    spatial_hash_cell_size: int = 64
+    compare_collision_broad_phase: bool = False
+    use_swept_bullet_collisions: bool = True
+    use_entity_store: bool = False
+    object_pool_size: int = 4096
+    text_cache_size: int = 256
+    use_dirty_rects: bool = False
+    dirty_rects_max_screen_share: float = 0.5
+    tick_rate: int = 60
+    frame_rate_cap: int = 60  # 0 for uncapped
+    max_ticks_per_frame: int = 5
+    use_late_input_sampling: bool = False  # needs a frame rate cap
+    late_input_margin_ms: float = 1.0
+    use_sprite_atlas: bool = False
+    sprite_atlas_angles: int = 32  # frames per shape, memory grows linearly
+    use_sprite_batch: bool = False
+    asteroid_shapes_per_size: int = 16
+    asteroid_shape_seed: int | None = 0  # None for a new library every run
+    use_render_thread: bool = False  # game frames drawn while simulating
+    use_quality_governor: bool = False
+    quality_budget_ms: float = 14.0  # frame work before quality drops
+    quality_hud_interval: int = 10  # frames between reduced HUD updates
+    quality_far_distance: int = 300  # bullets this far skip swept checks
+    quality_render_interval: int = 2  # frames per render when skipping
+    profiler_frames: int = 600
+    input_log_checksum_interval: int = 60  # ticks
+    use_rewind: bool = False
+    rewind_seconds: float = 10.0
+    rewind_keyframe_interval: int = 30  # ticks
+    stress_spawn_per_tick: int = 50
+    stress_log_bucket: int = 250  # asteroids per frame time log row
+    font_cache_path: str = '~/.cache/space-miner/fonts.json'  # '' disables
+    save_path: str = '~/.local/share/space-miner/profile.sav'  # '' disables
+    save_coalesce_seconds: float = 0.5
 
 
 @dataclass
@@ -43,6 +80,12 @@ class UserStats:
     lives: int = DefaultStats.lives
     max_bullets: int = DefaultStats.max_bullets
 
+    def reset(self, defaults: 'DefaultStats | UserStats') -> None:
+        self.level = defaults.level
+        self.credits = defaults.credits
+        self.lives = defaults.lives
+        self.max_bullets = defaults.max_bullets
+
 
 @dataclass
 class Colors:
@@ -1,77 +1,416 @@
-from time import time
+from argparse import ArgumentParser
+from functools import cached_property
+from pathlib import Path
+from random import Random, SystemRandom
+from time import perf_counter, time
 from typing import TYPE_CHECKING
 
 import pygame as pg
-from pygame import Surface
+from pygame import K_F3, Rect, Surface
 from pygame.time import Clock
 
 from components.game import Game
+from components.input_log import InputLogWriter
+from components.latency import FramePacer, InputLatencyProbe
 from components.menu import (
     MainMenu,
     PauseMenu,
     ShopMenu,
 )
-from settings import AppEvents, Settings
+from components.profiler import (
+    PopulationLog,
+    ProfilerOverlay,
+    profiler,
+)
+from components.quality import QualityGovernor, QualityLevel
+from components.render_thread import RenderThread
+from components.rendering import FrameSnapshot
+from components.saves import SaveWriter, load_profile
+from settings import AppEvents, Settings, UserStats
 
 if TYPE_CHECKING:
     from abstractions.apps import AppComponent
 
 
 class Main:
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        profile_csv: Path | None = None,
+        record: Path | None = None,
+        seed: int | None = None,
+        started_at: float | None = None,
+        stress_population: int = 0,
+        is_measuring_latency: bool = False,
+        is_timing_startup: bool = False,
+    ) -> None:
+        self.started_at: float = (
+            started_at if started_at is not None else perf_counter()
+        )
+        self.is_timing_startup: bool = is_timing_startup
+        self.time_to_first_frame: float | None = None
+
         pg.display.set_caption('Space Miner')
         self.screen: Surface = pg.display.set_mode(Settings.screen_size)
         self.clock: Clock = Clock()
+        self.pacer: FramePacer | None = (
+            FramePacer(
+                Settings.frame_rate_cap,
+                Settings.late_input_margin_ms / 1000,
+            )
+            if Settings.use_late_input_sampling and Settings.frame_rate_cap
+            else None
+        )
+        self.latency_probe: InputLatencyProbe | None = (
+            InputLatencyProbe() if is_measuring_latency else None
+        )
+        self.sim_time: float = time()
 
-        self.main_menu: AppComponent = MainMenu(self.screen)
-        self.game: AppComponent = Game(self.screen)
-        self.pause: AppComponent = PauseMenu(self.screen)
-        self.shop: AppComponent = ShopMenu(self.screen)
+        self.stats: UserStats = UserStats()
+        self.saved_stats: UserStats | None = None
+        self.save_writer: SaveWriter | None = None
+        if Settings.save_path:
+            save_path = Path(Settings.save_path).expanduser()
+            self.saved_stats = load_profile(save_path)
+            self.save_writer = SaveWriter(
+                save_path,
+                Settings.save_coalesce_seconds,
+            )
+        if seed is None:
+            seed = SystemRandom().getrandbits(64)
+        self.seed: int = seed
+        self.stress_population: int = stress_population
+        self.population_log: PopulationLog | None = (
+            PopulationLog(Settings.stress_log_bucket)
+            if stress_population
+            else None
+        )
 
         self.current_component: AppComponent = self.main_menu
         self.is_running: bool = True
 
+        self.profile_csv: Path | None = profile_csv
+        self.profiler_overlay: ProfilerOverlay = ProfilerOverlay(profiler)
+        profiler.is_enabled = profile_csv is not None
+
+        self.quality: QualityGovernor | None = None
+        if Settings.use_quality_governor:
+            # Recordings have to replay, so the simulation stays exact.
+            levels = [
+                level
+                for level in QualityLevel
+                if record is None
+                or level is not QualityLevel.coarse_collisions
+            ]
+            self.quality = QualityGovernor(
+                Settings.quality_budget_ms / 1000,
+                levels,
+                Settings.quality_render_interval,
+            )
+            self.profiler_overlay.quality = self.quality
+
+        self.render_thread: RenderThread | None = (
+            RenderThread(self.screen) if Settings.use_render_thread else None
+        )
+
+        self.input_log: InputLogWriter | None = None
+        if record is not None:
+            self.input_log = InputLogWriter.open(
+                record,
+                seed,
+                Settings.input_log_checksum_interval,
+                stress_population,
+            )
+
+    # Components are built the first time they are shown.
+    @cached_property
+    def main_menu(self) -> MainMenu:
+        return MainMenu(self.screen, self.stats)
+
+    @cached_property
+    def game(self) -> Game:
+        game = Game(self.screen, Random(self.seed), self.stats)
+        game.quality = self.quality
+        self.profiler_overlay.pools = {
+            'asteroids': game.asteroid_pool,
+            'bullets': game.bullet_pool,
+        }
+        if self.saved_stats is not None:
+            # The game starts the saved level on its first update.
+            self.stats.reset(self.saved_stats)
+            game.ship.cur_bullets = self.stats.max_bullets
+        if self.stress_population:
+            game.enable_stress_mode(self.stress_population)
+        return game
+
+    @cached_property
+    def pause(self) -> PauseMenu:
+        return PauseMenu(self.screen, self.stats)
+
+    @cached_property
+    def shop(self) -> ShopMenu:
+        return ShopMenu(self.screen, self.stats)
+
     def handle_input(self) -> set[int]:
         keys_pressed: set[int] = set()
-        for event in pg.event.get():
+        polled_at = perf_counter()
+        events = pg.event.get()
+        key_downs = 0
+        for event in events:
             if event.type == pg.QUIT:
                 self.is_running = False
                 break
 
             if event.type == pg.KEYDOWN:
                 keys_pressed.add(event.key)
+                key_downs += 1
+
+        if self.latency_probe is not None:
+            self.latency_probe.poll(polled_at, key_downs)
+
+        if K_F3 in keys_pressed:
+            self.toggle_profiler_overlay()
 
         return keys_pressed
 
-    def run(self) -> None:
-        while self.is_running:
+    def toggle_profiler_overlay(self) -> None:
+        self.profiler_overlay.toggle()
+        profiler.is_enabled = (
+            self.profiler_overlay.is_visible or self.profile_csv is not None
+        )
+        self.current_component.invalidate()
+
+    def capture_frame(self, snapshot: FrameSnapshot) -> None:
+        self.game.capture(snapshot)
+        overlay = self.profiler_overlay.blit()
+        if overlay is not None:
+            snapshot.hud.append(overlay)
 
-            dt = self.clock.tick(60) / 1000.0
+    def draw(self, accumulator: float, tick: float) -> None:
+        self.current_component.interpolation = accumulator / tick
+        if self.render_thread is not None:
+            if isinstance(self.current_component, Game):
+                self.render_thread.publish(self.capture_frame)
+                profiler.lap('draw')
+                return
+            # Menus draw on this thread, after the game frames in flight.
+            self.render_thread.wait_idle()
 
-            self.current_component.handle_input(self.handle_input())
-            self.current_component.update(dt, time())
-            self.current_component.draw()
+        self.current_component.draw()
+        overlay_rect = self.profiler_overlay.draw(self.screen)
+        profiler.lap('draw')
+        self.update_display(overlay_rect)
 
+    def should_skip_render(self) -> bool:
+        return (
+            self.quality is not None
+            and isinstance(self.current_component, Game)
+            and self.quality.should_skip_render()
+        )
+
+    def object_counts(self) -> tuple[int, int]:
+        if not isinstance(self.current_component, Game):
+            return 0, 0
+        return (
+            len(self.current_component.asteroids),
+            len(self.current_component.ship.bullets),
+        )
+
+    def update_display(self, overlay_rect: Rect | None = None) -> None:
+        dirty_rects = self.current_component.dirty_rects
+        if not Settings.use_dirty_rects or dirty_rects is None:
             pg.display.flip()
+            return
 
-            event = self.current_component.event
-            self.current_component.event = AppEvents.no_event
-            match event:
-                case AppEvents.quit_the_game:
-                    self.is_running = False
+        if overlay_rect is not None:
+            dirty_rects = [*dirty_rects, overlay_rect]
+
+        screen_rect = self.screen.get_rect()
+        dirty_area = sum(rect.width * rect.height for rect in dirty_rects)
+        if (
+            dirty_area
+            > screen_rect.width
+            * screen_rect.height
+            * Settings.dirty_rects_max_screen_share
+        ):
+            pg.display.flip()
+        elif dirty_rects:
+            pg.display.update(dirty_rects)
+
+    def save_progress(self) -> None:
+        if self.save_writer is not None:
+            self.save_writer.save(self.stats)
+
+    def switch_component(self) -> None:
+        event = self.current_component.event
+        self.current_component.event = AppEvents.no_event
+        match event:
+            case AppEvents.quit_the_game:
+                self.is_running = False
+            case AppEvents.go_to_main_menu:
+                # Game over, the stats are back to the defaults.
+                self.save_progress()
+                self.current_component = self.main_menu
+            case AppEvents.go_to_the_game:
+                if isinstance(self.current_component, ShopMenu):
+                    # The next level is unlocked once the shop is left.
+                    self.save_progress()
+                self.current_component = self.game
+            case AppEvents.go_to_pause_menu:
+                self.current_component = self.pause
+            case AppEvents.go_to_shop_menu:
+                # Level cleared.
+                self.save_progress()
+                self.current_component = self.shop
+            case AppEvents.save_progress:
+                self.save_progress()
+
+        if event is not AppEvents.no_event:
+            self.current_component.invalidate()
+
+    def run(self) -> None:
+        tick = 1 / Settings.tick_rate
+        accumulator = 0.0
+        inputs: set[int] = set()
+
+        while self.is_running:
+
+            if self.pacer is not None:
+                accumulator += self.pacer.wait()
+            else:
+                accumulator += (
+                    self.clock.tick(Settings.frame_rate_cap) / 1000.0
+                )
+            frame_started_at = perf_counter()
+            profiler.mark()
+            inputs |= self.handle_input()
+            profiler.lap('input')
+
+            ticks = 0
+            while accumulator >= tick and self.is_running:
+                if ticks == Settings.max_ticks_per_frame:
+                    # Too far behind after a hitch, drop the backlog.
+                    accumulator %= tick
                     break
-                case AppEvents.go_to_main_menu:
-                    self.current_component = self.main_menu
-                case AppEvents.go_to_the_game:
-                    self.current_component = self.game
-                case AppEvents.go_to_pause_menu:
-                    self.current_component = self.pause
-                case AppEvents.go_to_shop_menu:
-                    self.current_component = self.shop
 
+                input_log = (
+                    self.input_log
+                    if isinstance(self.current_component, Game)
+                    else None
+                )
+                if input_log is not None:
+                    input_log.record_tick(
+                        tick,
+                        self.sim_time,
+                        self.game.get_pressed(),
+                        inputs,
+                        self.stats,
+                    )
+
+                profiler.mark()
+                if self.latency_probe is not None:
+                    self.latency_probe.consume()
+                self.current_component.handle_input(inputs)
+                profiler.lap('input')
+                inputs = set()
+                self.sim_time += tick
+                self.current_component.update(tick, self.sim_time)
+                if input_log is not None:
+                    input_log.record_state(self.game)
+                accumulator -= tick
+                ticks += 1
+
+                self.switch_component()
+
+            if not self.is_running:
+                break
+
+            profiler.mark()
+            is_drawing = not self.should_skip_render()
+            if is_drawing:
+                self.draw(accumulator, tick)
+            profiler.lap('flip')
+            if self.latency_probe is not None and is_drawing:
+                self.latency_probe.frame_shown()
+            if self.pacer is not None:
+                self.pacer.end_work()
+            asteroids, bullets = self.object_counts()
+            profiler.end_frame(asteroids, bullets)
+            frame_time = perf_counter() - frame_started_at
+            if self.quality is not None and isinstance(
+                self.current_component,
+                Game,
+            ):
+                self.quality.record(frame_time)
+            if self.population_log is not None and asteroids:
+                self.population_log.record(frame_time, asteroids)
+
+            if self.is_timing_startup and self.time_to_first_frame is None:
+                self.time_to_first_frame = perf_counter() - self.started_at
+                print(
+                    'Time to first frame: '
+                    f'{self.time_to_first_frame * 1000:.0f} ms',
+                )
+
+        if self.render_thread is not None:
+            self.render_thread.stop()
+            print(self.render_thread.report())
+        if self.profile_csv is not None:
+            profiler.dump_csv(self.profile_csv)
+        if self.input_log is not None:
+            self.input_log.close()
+        if self.save_writer is not None:
+            self.save_writer.close()
+        if self.population_log is not None:
+            print('\n'.join(self.population_log.report()))
+        if self.latency_probe is not None:
+            print('\n'.join(self.latency_probe.report()))
+        if self.quality is not None:
+            print('\n'.join(self.quality.report()))
         pg.quit()
 
 
 if __name__ == '__main__':
-    pg.init()
-    Main().run()
+    started_at = perf_counter()
+    parser = ArgumentParser(description='Space Miner')
+    parser.add_argument(
+        '--profile-csv',
+        type=Path,
+        help='record per-phase frame timings and write them here on exit',
+    )
+    parser.add_argument(
+        '--record',
+        type=Path,
+        help='record the game inputs to a binary log for headless.py --replay',
+    )
+    parser.add_argument('--seed', type=int, help='random when omitted')
+    parser.add_argument(
+        '--stress',
+        type=int,
+        default=0,
+        metavar='POPULATION',
+        help='endless mode keeping this many asteroids alive',
+    )
+    parser.add_argument(
+        '--input-latency',
+        action='store_true',
+        help='report key press to display flip latency on exit',
+    )
+    parser.add_argument(
+        '--startup-time',
+        action='store_true',
+        help='print the time from launch to the first displayed frame',
+    )
+    args = parser.parse_args()
+
+    # Only the modules the game uses, audio and joystick setup are slow.
+    pg.display.init()
+    pg.font.init()
+    Main(
+        args.profile_csv,
+        args.record,
+        args.seed,
+        started_at,
+        args.stress,
+        args.input_latency,
+        args.startup_time,
+    ).run()